@@ -1,25 +1,280 @@
+import functools
+import hashlib
+import heapq
+import json
+import multiprocessing
 import os
+import re
+import secrets
+import shutil
 import tempfile
-from typing import Optional
+import time
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterator, Optional
 
-from flask import Flask, Response, flash, redirect, render_template_string, request, send_file, url_for, jsonify
-from uuid import uuid4
+from flask import Flask, Request, Response, flash, redirect, render_template, request, send_file, url_for, jsonify
+from werkzeug.exceptions import ClientDisconnected
+from werkzeug.formparser import FormDataParser, MultiPartParser
+from werkzeug.wsgi import wrap_file
 import threading
 
-import vertical_analysis
-from orchestra_signals_engine import process_signals
+# vertical_analysis and orchestra_signals_engine pull in pandas/numpy, so they are imported
+# inside the handlers that need them; serving "/" never loads them
 
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET", "dev-secret")
+# Let a fronting proxy (Apache/lighttpd X-Sendfile, or nginx mapping it to X-Accel-Redirect) send files
+app.config["USE_X_SENDFILE"] = os.environ.get("USE_X_SENDFILE", "").lower() in {"1", "true", "yes"}
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_UPLOAD_BYTES", str(2 * 1024**3)))
+
+
+class StripedDict:
+    """Dict shared by request threads and pool callbacks.
+
+    Keys are spread over ``stripes`` buckets, each with its own lock. Reads are lock-free
+    (a single dict lookup is atomic in CPython); writes lock only the key's stripe.
+    """
+
+    def __init__(self, stripes: int = 16) -> None:
+        assert stripes & (stripes - 1) == 0, "stripes must be a power of two"
+        self._mask = stripes - 1
+        self._buckets: list[dict] = [{} for _ in range(stripes)]
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def _index(self, key) -> int:
+        return hash(key) & self._mask
+
+    def get(self, key, default=None):
+        return self._buckets[self._index(key)].get(key, default)
+
+    def __contains__(self, key) -> bool:
+        return key in self._buckets[self._index(key)]
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets)
+
+    def __setitem__(self, key, value) -> None:
+        i = self._index(key)
+        with self._locks[i]:
+            self._buckets[i][key] = value
+
+    def pop(self, key, default=None):
+        i = self._index(key)
+        with self._locks[i]:
+            return self._buckets[i].pop(key, default)
+
+    def items(self) -> list:
+        """Snapshot of every entry; each stripe is copied under its lock."""
+        out = []
+        for bucket, lock in zip(self._buckets, self._locks):
+            with lock:
+                out.extend(bucket.items())
+        return out
+
+    def pop_where(self, predicate) -> list:
+        """Remove and return the entries whose value satisfies ``predicate``, one stripe at a time."""
+        out = []
+        for bucket, lock in zip(self._buckets, self._locks):
+            with lock:
+                stale = [key for key, value in bucket.items() if predicate(value)]
+                out.extend((key, bucket.pop(key)) for key in stale)
+        return out
+
+    def lock(self, key) -> threading.RLock:
+        """The (re-entrant) lock guarding ``key``, for check-then-set sequences."""
+        return self._locks[self._index(key)]
+
+    def update_item(self, key, **fields) -> Optional[dict]:
+        """Swap the dict at ``key`` for a copy carrying ``fields``; None if ``key`` is gone.
+
+        Readers see either the old or the new dict, never a half-applied transition.
+        """
+        i = self._index(key)
+        with self._locks[i]:
+            current = self._buckets[i].get(key)
+            if current is None:
+                return None
+            updated = self._buckets[i][key] = {**current, **fields}
+            return updated
+
 
 # In-memory registries (simple, volatile)
-# Uploads: upload_token -> tmp_path
-UPLOADS: dict[str, str] = {}
-# Downloads: download_token -> (file_path, suggested_filename)
-DOWNLOADS: dict[str, tuple[str, str]] = {}
-# Pass2 jobs: up_token -> {status: str, dl_token: str | None, error: str | None}
-PASS2_JOBS: dict[str, dict] = {}
+# Uploads: upload_token -> (tmp_path, last_used monotonic seconds)
+UPLOADS = StripedDict()
+# Upload content hashes: upload_token -> sha256 hex digest (output cache key)
+UPLOAD_DIGESTS = StripedDict()
+# Downloads: download_token -> (file_path, suggested_filename, registered_at monotonic seconds)
+DOWNLOADS = StripedDict()
+# Pass1/Pass2 jobs: up_token -> {status: str, dl_token: str | None, error: str | None}
+PASS1_JOBS = StripedDict()
+PASS2_JOBS = StripedDict()
+# Pass 1 outputs: up_token -> out_path (Pass 2 input)
+PASS1_OUTPUT = StripedDict()
+# Download tokens issued per upload: up_token -> [download_token, ...]
+UPLOAD_DOWNLOADS = StripedDict()
+
+# Job transitions wake /events/<pass> streams; they also re-check every JOB_EVENTS_RECHECK seconds
+# (queued -> running has no callback), send a keepalive comment when quiet, and close after
+# JOB_EVENTS_MAX_SECONDS
+_JOB_CHANGED = threading.Condition()
+JOB_EVENTS_RECHECK = 1.0
+JOB_EVENTS_HEARTBEAT = 15
+JOB_EVENTS_MAX_SECONDS = 300
+
+# CPU-bound analysis runs in worker processes so request threads stay free
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", os.cpu_count() or 1))
+_ANALYSIS_POOL: Optional[ProcessPoolExecutor] = None
+_ANALYSIS_POOL_LOCK = threading.Lock()
+
+# Processed outputs are cached on disk by upload content hash (least recently used evicted)
+CACHE_DIR = os.environ.get("ORCHESTRA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "orchestra-cache"))
+CACHE_THRESHOLD = int(os.environ.get("ORCHESTRA_CACHE_THRESHOLD", "500"))
+
+
+def _analysis_fingerprint() -> bytes:
+    # Seeds every cache key so a deploy with changed analysis code never serves stale outputs
+    h = hashlib.sha256()
+    for name in ("vertical_analysis.py", "orchestra_signals_engine.py"):
+        with open(os.path.join(os.path.dirname(__file__), name), "rb") as f:
+            h.update(f.read())
+    return h.digest()
+
+
+_CACHE_SALT = _analysis_fingerprint()
+
+
+def _work_root() -> str:
+    # Per-upload working directories live on tmpfs when the host provides one
+    root = os.environ.get("ORCHESTRA_WORK_DIR")
+    if not root:
+        shm = "/dev/shm"
+        base = shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else tempfile.gettempdir()
+        root = os.path.join(base, "orchestra")
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+# Each upload gets its own directory holding the input and every output derived from it
+WORK_ROOT = _work_root()
+
+# Multipart uploads (the no-JS fallback) are parsed in 256 KiB reads
+MULTIPART_BUFFER_SIZE = 256 * 1024  # must stay below MAX_FORM_MEMORY_SIZE
+
+
+class _UploadSink:
+    """Destination for one uploaded CSV: written straight to a fresh working directory.
+
+    The cache digest, byte count and first UPLOAD_PEEK_SIZE bytes are collected as the
+    data is written. Unless the upload handler claims it, the sink's directory is removed
+    again when it is closed or when the request ends (stray file fields, or a multipart
+    post that failed to parse).
+
+    The file is opened O_NOATIME since it is only ever read back by the analysis. It is
+    not preallocated: the client's Content-Length is unchecked at this point, and the
+    default work root is tmpfs, where a reservation would pin RAM.
+    """
+
+    def __init__(self) -> None:
+        self.workdir = tempfile.mkdtemp(prefix="upload-", dir=WORK_ROOT)
+        self.path = os.path.join(self.workdir, "input.csv")
+        self.digest = hashlib.sha256(_CACHE_SALT)
+        self.head = b""
+        self.size = 0
+        self.claimed = False
+        flags = os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOATIME", 0)
+        self._file = os.fdopen(os.open(self.path, flags, 0o600), "w+b")
+
+    def write(self, data: bytes) -> int:
+        self._file.write(data)
+        self.digest.update(data)
+        if self.size < UPLOAD_PEEK_SIZE:
+            self.head += bytes(data[: UPLOAD_PEEK_SIZE - self.size])
+        self.size += len(data)
+        return len(data)
+
+    def __getattr__(self, name):
+        # read/seek/tell/flush etc. go to the underlying file
+        return getattr(self._file, name)
+
+    def close(self) -> None:
+        self._file.close()
+        if not self.claimed:
+            self.discard()
+
+    def discard(self) -> None:
+        self._file.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class _UploadFormParser(FormDataParser):
+    def _parse_multipart(self, stream, mimetype, content_length, options):
+        parser = MultiPartParser(
+            stream_factory=self.stream_factory,
+            max_form_memory_size=self.max_form_memory_size,
+            max_form_parts=self.max_form_parts,
+            cls=self.cls,
+            buffer_size=MULTIPART_BUFFER_SIZE,
+        )
+        boundary = options.get("boundary", "").encode("ascii")
+        if not boundary:
+            raise ValueError("Missing boundary")
+        form, files = parser.parse(stream, boundary, content_length)
+        return stream, form, files
+
+
+class UploadRequest(Request):
+    form_data_parser_class = _UploadFormParser
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._upload_sinks: list[_UploadSink] = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # File parts are parsed directly into their upload working directory, not a spool file
+        sink = _UploadSink()
+        self._upload_sinks.append(sink)
+        return sink
+
+    def close(self) -> None:
+        # A form that fails to parse part-way (truncated body, missing closing boundary,
+        # a limit hit mid-stream) never hands its file parts to request.files, so
+        # Werkzeug would not close them; drop every sink the handler did not claim
+        try:
+            super().close()
+        finally:
+            for sink in self._upload_sinks:
+                if not sink.claimed:
+                    sink.discard()
+
+
+app.request_class = UploadRequest
+
+# Unclaimed downloads expire after DOWNLOAD_TTL seconds (swept every SWEEP_INTERVAL);
+# past MAX_DOWNLOADS the oldest entries are evicted first
+DOWNLOAD_TTL = int(os.environ.get("DOWNLOAD_TTL_SECONDS", "1800"))
+MAX_DOWNLOADS = 10_000
+SWEEP_INTERVAL = 60
+# Uploads untouched by a pass run for UPLOAD_TTL seconds are discarded with their outputs
+UPLOAD_TTL = int(os.environ.get("UPLOAD_TTL_SECONDS", "14400"))
+_SWEEPER: Optional[threading.Thread] = None
+_SWEEPER_LOCK = threading.Lock()
+# Upload/download tokens carry TOKEN_BYTES of randomness (128 bits, 22 URL-safe characters)
+TOKEN_BYTES = 16
+
+# Uploads are copied to disk in 1 MiB chunks; downloads are streamed in 256 KiB blocks
+UPLOAD_CHUNK_SIZE = 1 << 20
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+# Uploads smaller than UPLOAD_MIN_SIZE, or fitting in the first UPLOAD_PEEK_SIZE bytes without a data row, are rejected
+UPLOAD_PEEK_SIZE = 8192
+UPLOAD_MIN_SIZE = 32
+# Downloads are gzip-encoded on the fly for clients that accept it, unless too small to benefit
+DOWNLOAD_GZIP_LEVEL = int(os.environ.get("DOWNLOAD_GZIP_LEVEL", "4"))
+DOWNLOAD_GZIP_MIN_SIZE = 1024
+# nginx internal location aliased to WORK_ROOT (e.g. "/_work/"); when set, uncompressed
+# downloads are handed to nginx with X-Accel-Redirect and sent by it with sendfile(2)
+X_ACCEL_REDIRECT_PREFIX = os.environ.get("X_ACCEL_REDIRECT_PREFIX", "")
 
 
 INDEX_HTML = """
@@ -89,7 +344,7 @@ INDEX_HTML = """
 
         <p class=\"note\">Upload a CSV, then run Pass 1 (states/modifiers) and Pass 2 (signals) as independent steps.</p>
         <div class=\"divider\"></div>
-        <form method=\"post\" action=\"{{ url_for('upload') }}\" enctype=\"multipart/form-data\">
+        <form id=\"upload_form\" method=\"post\" action=\"{{ url_for('upload') }}\" enctype=\"multipart/form-data\">
           <label for=\"csv\">CSV File</label><br/>
           <input id=\"csv\" type=\"file\" name=\"file\" accept=\".csv\" required />
           <div class=\"row\"><button class=\"btn\" type=\"submit\">Upload File</button></div>
@@ -98,6 +353,28 @@ INDEX_HTML = """
 
       
     </main>
+    <script>
+      // Post the file as a raw body so the server can stream it straight to disk;
+      // without fetch the form falls back to a regular multipart submit.
+      (function(){
+        const form = document.getElementById('upload_form');
+        if (!form || !window.fetch) return;
+        form.addEventListener('submit', function(ev){
+          const file = form.elements['file'].files[0];
+          if (!file) return;
+          ev.preventDefault();
+          form.querySelector('button').disabled = true;
+          fetch(form.action, {
+            method: 'POST',
+            body: file,
+            headers: {'Content-Type': 'application/octet-stream', 'X-Filename': encodeURIComponent(file.name)}
+          })
+            .then(function(r){ return r.text(); })
+            .then(function(html){ document.open(); document.write(html); document.close(); })
+            .catch(function(){ form.submit(); });
+        });
+      })();
+    </script>
   </body>
   </html>
 """
@@ -168,7 +445,7 @@ DASHBOARD_HTML = """
       <form method=\"post\" action=\"{{ url_for('run_pass2') }}\">
         <input type=\"hidden\" name=\"u\" value=\"{{ up_token }}\" />
         <div class=\"row\">
-          <div><button class=\"btn\" type=\"submit\" {% if not pass1_complete %}disabled{% endif %}>Start Pass 2</button></div>
+          <div><button class=\"btn\" id=\"pass2_btn\" type=\"submit\" {% if not pass1_complete %}disabled{% endif %}>Start Pass 2</button></div>
           <div class=\"status\" id=\"pass2_status\">{{ pass2_status }}</div>
           <div id=\"pass2_dl\">{% if pass2_dl_token %}<a class=\"download\" href=\"{{ url_for('download_token', token=pass2_dl_token) }}\">Download</a>{% else %}&nbsp;{% endif %}</div>
         </div>
@@ -187,168 +464,525 @@ DASHBOARD_HTML = """
     </div>
     <script>
       (function(){
-        const statusEl = document.getElementById('pass2_status');
-        const dlEl = document.getElementById('pass2_dl');
         const upTokenEl = document.querySelector('input[name="u"]');
-        if (!statusEl || !dlEl || !upTokenEl) return;
+        if (!upTokenEl) return;
         const upToken = upTokenEl.value;
-        function poll(){
-          fetch('/status/pass2?u=' + encodeURIComponent(upToken))
-            .then(function(r){ return r.ok ? r.json() : null; })
-            .then(function(data){
-              if (!data) return;
-              if (data.status_text) statusEl.textContent = data.status_text;
-              if (data.dl_token) {
-                var href = '{{ url_for('download_token', token='__TOKEN__') }}'.replace('__TOKEN__', data.dl_token);
-                dlEl.innerHTML = '<a class="download" href="' + href + '">Download</a>';
-                return;
-              }
-              setTimeout(poll, 2000);
-            })
-            .catch(function(){ setTimeout(poll, 3000); });
-        }
-        var txt = (statusEl.textContent || '').toLowerCase();
-        if (txt.indexOf('running') !== -1 || txt.indexOf('queued') !== -1) {
-          poll();
+        function watch(pass, onDone){
+          const statusEl = document.getElementById(pass + '_status');
+          const dlEl = document.getElementById(pass + '_dl');
+          if (!statusEl || !dlEl) return;
+          // Apply a status update; true once the job is finished (download ready, failed or reset)
+          function apply(data){
+            if (data.status_text) statusEl.textContent = data.status_text;
+            if (data.dl_token) {
+              var href = '{{ url_for('download_token', token='__TOKEN__') }}'.replace('__TOKEN__', data.dl_token);
+              dlEl.innerHTML = '<a class="download" href="' + href + '">Download</a>';
+              if (onDone) onDone();
+              return true;
+            }
+            return data.status === 'error' || data.status === 'idle';
+          }
+          function poll(){
+            fetch('/status/' + pass + '?u=' + encodeURIComponent(upToken))
+              .then(function(r){ return r.ok ? r.json() : null; })
+              .then(function(data){
+                if (!data) return;
+                if (!apply(data)) setTimeout(poll, 2000);
+              })
+              .catch(function(){ setTimeout(poll, 3000); });
+          }
+          // Server-sent events push each state change; fall back to polling without them
+          function listen(){
+            var es = new EventSource('/events/' + pass + '?u=' + encodeURIComponent(upToken));
+            es.onmessage = function(e){ if (apply(JSON.parse(e.data))) es.close(); };
+            es.onerror = function(){ if (es.readyState === EventSource.CLOSED) poll(); };
+          }
+          var txt = (statusEl.textContent || '').toLowerCase();
+          if (txt.indexOf('running') !== -1 || txt.indexOf('queued') !== -1) {
+            if (window.EventSource) listen(); else poll();
+          }
         }
+        watch('pass1', function(){
+          const btn = document.getElementById('pass2_btn');
+          const pass2StatusEl = document.getElementById('pass2_status');
+          if (btn) btn.disabled = false;
+          if (pass2StatusEl) pass2StatusEl.textContent = 'Ready';
+        });
+        watch('pass2');
       })();
     </script>
   </body>
   </html>
 """
 
+_EMBEDDED_BLOCK = re.compile(r"(<script\b.*?</script>|<style\b.*?</style>)", re.S | re.I)
+
+
+def _minify(html: str) -> str:
+    """Drop comments and collapse whitespace; scripts keep their line breaks (``//`` comments)."""
+    parts = _EMBEDDED_BLOCK.split(html)
+    for i, part in enumerate(parts):
+        if part.startswith("<script"):
+            parts[i] = re.sub(r"\n\s+", "\n", part)
+        else:
+            part = re.sub(r"/\*.*?\*/" if part.startswith("<style") else r"<!--.*?-->", "", part, flags=re.S)
+            parts[i] = re.sub(r"\s+", " ", part)
+    return "".join(parts).strip()
+
+
+# Minified and compiled once at import; rendered through render_template so url_for/flash stay available
+_INDEX_TPL = app.jinja_env.from_string(_minify(INDEX_HTML))
+_DOWNLOAD_TPL = app.jinja_env.from_string(_minify(DOWNLOAD_HTML))
+_DASHBOARD_TPL = app.jinja_env.from_string(_minify(DASHBOARD_HTML))
+
+
+def _analysis_pool() -> ProcessPoolExecutor:
+    """Return the shared analysis process pool, creating it on first use."""
+    global _ANALYSIS_POOL
+    with _ANALYSIS_POOL_LOCK:
+        if _ANALYSIS_POOL is None:
+            # Request threads are live by now, so avoid forking the server process directly
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _ANALYSIS_POOL = ProcessPoolExecutor(
+                max_workers=ANALYSIS_WORKERS, mp_context=multiprocessing.get_context(method)
+            )
+        return _ANALYSIS_POOL
+
+
+def _cache_path(digest: str, kind: str) -> str:
+    return os.path.join(CACHE_DIR, f"{digest}.{kind}.csv")
+
+
+def _cache_fetch(digest: str, kind: str, dest: str) -> bool:
+    """Place the cached ``kind`` output for ``digest`` at ``dest``; False on a miss."""
+    src = _cache_path(digest, kind)
+    tmp_dest = f"{dest}.{secrets.token_hex(8)}.tmp"
+    try:
+        try:
+            os.link(src, tmp_dest)
+        except OSError:
+            shutil.copyfile(src, tmp_dest)
+        os.replace(tmp_dest, dest)
+        os.utime(src)  # mark as recently used
+    except OSError:
+        return False
+    return True
+
+
+def _cache_store(digest: str, kind: str, src: str) -> None:
+    """Copy a freshly produced output into the cache, then trim it to CACHE_THRESHOLD."""
+    dest = _cache_path(digest, kind)
+    tmp_dest = f"{dest}.{secrets.token_hex(8)}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        shutil.copyfile(src, tmp_dest)
+        os.replace(tmp_dest, dest)
+        entries = sorted(
+            (e for e in os.scandir(CACHE_DIR) if e.name.endswith(".csv")),
+            key=lambda e: e.stat().st_mtime,
+        )
+        for entry in entries[: max(len(entries) - CACHE_THRESHOLD, 0)]:
+            os.unlink(entry.path)
+    except OSError as e:
+        print(f"Warning: Could not update output cache: {e}")
+
+
+def _new_token() -> str:
+    """Unguessable URL-safe token for upload and download links."""
+    return secrets.token_urlsafe(TOKEN_BYTES)
+
+
+def _discard_file(path: str) -> None:
+    """Delete ``path`` and its upload working directory once that is empty."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass  # Already gone (ENOENT) or not removable
+    parent = os.path.dirname(path)
+    if os.path.dirname(parent) == WORK_ROOT:
+        try:
+            os.rmdir(parent)
+        except OSError:
+            pass  # Not empty or already gone
+
+
+def _sweep() -> None:
+    """Expire unclaimed downloads older than DOWNLOAD_TTL and idle uploads older than UPLOAD_TTL."""
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        now = time.monotonic()
+        cutoff = now - DOWNLOAD_TTL
+        for _, (path, _, _) in DOWNLOADS.pop_where(lambda entry: entry[2] < cutoff):
+            _discard_file(path)
+        cutoff = now - UPLOAD_TTL
+        for up_token, (_, last_used) in UPLOADS.items():
+            if last_used >= cutoff:
+                continue
+            # Leave uploads with a pass still in flight; they are swept once it settles
+            if any(_job_state(jobs.get(up_token) or {}) in ("queued", "running") for jobs in (PASS1_JOBS, PASS2_JOBS)):
+                continue
+            _discard_upload(up_token)
+
+
+def _touch_upload(up_token: str) -> Optional[str]:
+    """Return the upload's path and mark it as used, or None if it is unknown or expired."""
+    with UPLOADS.lock(up_token):
+        upload = UPLOADS.get(up_token)
+        if upload is None:
+            return None
+        UPLOADS[up_token] = (upload[0], time.monotonic())
+        return upload[0]
+
+
+def _discard_upload(up_token: str) -> None:
+    """Forget an upload and delete its working dir, downloads and Pass 1/Pass 2 jobs."""
+    # Uploaded file and associated downloads all live in the upload's working dir
+    upload = UPLOADS.pop(up_token, None)
+    UPLOAD_DIGESTS.pop(up_token, None)
+    for token in UPLOAD_DOWNLOADS.pop(up_token, None) or ():
+        DOWNLOADS.pop(token, None)
+    if upload:
+        shutil.rmtree(os.path.dirname(upload[0]), ignore_errors=True)
+
+    PASS1_JOBS.pop(up_token, None)
+    PASS2_JOBS.pop(up_token, None)
+    PASS1_OUTPUT.pop(up_token, None)
+    _notify_job_change()
+
+
+def _ensure_sweeper() -> None:
+    # Started on first use rather than import so it also runs in forked server workers
+    global _SWEEPER
+    if _SWEEPER is not None and _SWEEPER.is_alive():
+        return
+    with _SWEEPER_LOCK:
+        if _SWEEPER is None or not _SWEEPER.is_alive():
+            _SWEEPER = threading.Thread(target=_sweep, name="sweeper", daemon=True)
+            _SWEEPER.start()
+
+
+def _register_download(path: str, name: str) -> str:
+    """Register ``path`` for a one-time download and return its token."""
+    _ensure_sweeper()
+    token = _new_token()
+    DOWNLOADS[token] = (path, name, time.monotonic())
+    excess = len(DOWNLOADS) - MAX_DOWNLOADS
+    if excess > 0:
+        # Only reached when the registry is saturated; evict the oldest registrations
+        for oldest, (path, _, _) in heapq.nsmallest(excess, DOWNLOADS.items(), key=lambda kv: kv[1][2]):
+            if DOWNLOADS.pop(oldest, None):
+                _discard_file(path)
+    return token
+
+
+def _retire_job(job: Optional[dict]) -> None:
+    # A re-run rewrites the same output file; drop the superseded token so its expiry cannot delete it
+    if job and job.get("dl_token"):
+        DOWNLOADS.pop(job["dl_token"], None)
+
+
+def _start_job(jobs: StripedDict, up_token: str) -> bool:
+    """Mark a fresh run for ``up_token`` unless one is already in flight; True if the caller should start it."""
+    with jobs.lock(up_token):
+        job = jobs.get(up_token)
+        if job and job.get("status") not in {"error", "done"}:
+            return False
+        _retire_job(job)
+        jobs[up_token] = {"status": "queued", "dl_token": None, "error": None}
+        return True
+
+
+def _complete_job(jobs: StripedDict, up_token: str, out_path: str, prefix: str) -> None:
+    """Register ``out_path`` for download and mark the job for ``up_token`` done."""
+    dl_token = _register_download(out_path, f"{prefix}{os.path.basename(out_path)}")
+    if jobs.update_item(up_token, status="done", dl_token=dl_token) is None:
+        DOWNLOADS.pop(dl_token, None)  # reset while running
+    else:
+        if jobs is PASS1_JOBS:
+            PASS1_OUTPUT[up_token] = out_path
+        with UPLOAD_DOWNLOADS.lock(up_token):
+            live = [t for t in UPLOAD_DOWNLOADS.get(up_token, ()) if t in DOWNLOADS]
+            UPLOAD_DOWNLOADS[up_token] = live + [dl_token]
+    _notify_job_change()
+
+
+def _job_state(job: dict) -> str:
+    # Submitted jobs stay "queued" until the pool hands them to a worker process
+    status = job.get("status") or "idle"
+    future = job.get("future")
+    if status == "queued" and future is not None and future.running():
+        return "running"
+    return status
+
+
+def _job_status_text(job: dict, label: str) -> str:
+    return {
+        "queued": f"{label} Queued",
+        "running": f"{label} Running…",
+        "done": f"{label} Complete",
+        "error": f"Failed: {job.get('error','')}",
+    }.get(_job_state(job), "Ready")
+
+
+_IDLE_PAYLOAD = {"status": "idle", "status_text": "Ready"}
+_IDLE_STATUS_BODY = (json.dumps(_IDLE_PAYLOAD, separators=(",", ":")) + "\n").encode()
+
+
+def _job_payload(job: Optional[dict], label: str) -> dict:
+    if not job:
+        return _IDLE_PAYLOAD
+    return {
+        "status": _job_state(job),
+        "status_text": _job_status_text(job, label),
+        "dl_token": job.get("dl_token"),
+    }
+
+
+def _job_status(job: Optional[dict], label: str) -> Response:
+    if not job:
+        # Idle polls reuse a pre-encoded body; each still gets its own Response (they are mutable)
+        return Response(_IDLE_STATUS_BODY, mimetype="application/json")
+    return jsonify(_job_payload(job, label))
+
+
+def _notify_job_change() -> None:
+    with _JOB_CHANGED:
+        _JOB_CHANGED.notify_all()
+
+
+def _render_dashboard(
+    up_token: str,
+    pass1_status: str = "Ready",
+    pass2_status: str = "Waiting for Pass 1",
+    pass1_complete: bool = False,
+    pass1_dl_token: str = "",
+    pass2_dl_token: str = "",
+    mapping_preview: Optional[str] = None,
+) -> str:
+    """Render the Pass 1/Pass 2 dashboard for ``up_token``; download links are built by the template."""
+    if mapping_preview is None:
+        import vertical_analysis
+        mapping_preview = vertical_analysis.get_last_mapping_preview()
+    return render_template(
+        _DASHBOARD_TPL,
+        up_token=up_token,
+        pass1_status=pass1_status,
+        pass2_status=pass2_status,
+        pass1_complete=pass1_complete,
+        pass1_dl_token=pass1_dl_token,
+        pass2_dl_token=pass2_dl_token,
+        mapping_preview=mapping_preview,
+    )
+
 
 @app.get("/")
 def index() -> Response:
-    return render_template_string(INDEX_HTML)
+    return render_template(_INDEX_TPL)
+
+
+def _receive_upload() -> Optional[_UploadSink]:
+    """Land the uploaded CSV on disk and return its sink, or None if no file was sent.
+
+    The upload page posts the file as a raw ``application/octet-stream`` body so it
+    can be copied straight off ``request.stream``; plain multipart form posts fall
+    back to ``request.files``, whose file parts the parser already wrote to a sink.
+    """
+    if request.mimetype == "application/octet-stream":
+        if not request.headers.get("X-Filename"):
+            return None
+        sink = _UploadSink()
+        try:
+            for chunk in iter(lambda: request.stream.read(UPLOAD_CHUNK_SIZE), b""):
+                sink.write(chunk)
+            # Servers that mark the input terminated (gunicorn) end the stream at EOF
+            # rather than raising, so a body cut short has to be caught here
+            if request.content_length is not None and sink.size != request.content_length:
+                raise ClientDisconnected()
+            sink.flush()
+        except BaseException:
+            sink.discard()
+            raise
+    else:
+        uploaded = request.files.get("file")
+        if not uploaded or uploaded.filename == "" or not isinstance(uploaded.stream, _UploadSink):
+            return None
+        sink = uploaded.stream
+        sink.flush()
+    sink.claimed = True
+    return sink
 
 
 @app.post("/upload")
 def upload() -> Response:
-    uploaded = request.files.get("file")
-    if not uploaded or uploaded.filename == "":
+    # One pass over the body both writes the upload and computes its cache key
+    sink = _receive_upload()
+    if sink is None:
         flash("Please upload a CSV file.", "error")
         return redirect(url_for("index"))
-    with tempfile.NamedTemporaryFile(delete=False, suffix="_input.csv") as tmp:
-        uploaded.save(tmp.name)
-        up_token = uuid4().hex
-        UPLOADS[up_token] = tmp.name
-        
-        # Generate mapping preview immediately after upload
-        mapping_preview = ""
-        try:
-            mapping_preview = vertical_analysis.initialize_mappings_from_csv(tmp.name)
-        except Exception as e:
-            print(f"Warning: Could not generate mapping preview: {e}")
-            mapping_preview = f"<p style='color: #dc2626;'>⚠️ Could not analyze CSV structure: {e}</p>"
-    
-    return render_template_string(
-        DASHBOARD_HTML,
-        up_token=up_token,
-        pass1_status="Ready",
-        pass2_status="Waiting for Pass 1",
-        pass1_complete=False,
-        pass1_dl_token="",
-        pass2_dl_token="",
-        mapping_preview=mapping_preview,
-    )
+    tmp_path = sink.path
+
+    # Reject empty or header-only files before they reach the analysis pool
+    header_only = sink.size <= UPLOAD_PEEK_SIZE and sum(1 for line in sink.head.splitlines() if line.strip()) < 2
+    if sink.size < UPLOAD_MIN_SIZE or header_only:
+        sink.discard()
+        flash("CSV appears empty or missing rows.", "error")
+        return redirect(url_for("index"))
+    up_token = _new_token()
+    _ensure_sweeper()
+    UPLOADS[up_token] = (tmp_path, time.monotonic())
+    UPLOAD_DIGESTS[up_token] = sink.digest.hexdigest()
+
+    # Generate mapping preview immediately after upload
+    import vertical_analysis
+    mapping_preview = ""
+    try:
+        mapping_preview = vertical_analysis.initialize_mappings_from_csv(tmp_path)
+    except Exception as e:
+        print(f"Warning: Could not generate mapping preview: {e}")
+        mapping_preview = f"<p style='color: #dc2626;'>⚠️ Could not analyze CSV structure: {e}</p>"
+
+    return _render_dashboard(up_token, mapping_preview=mapping_preview)
 
 
 @app.post("/run/pass1")
 def run_pass1() -> Response:
     up_token = request.form.get("u", "")
-    tmp_path = UPLOADS.get(up_token)
+    tmp_path = _touch_upload(up_token)
     if not tmp_path:
         flash("Upload not found. Please upload your CSV again.", "error")
         return redirect(url_for("index"))
 
-    # Pass 1 (vertical analysis)
-    try:
-        out_path1 = vertical_analysis.process(tmp_path)
-    except Exception as e:
-        flash(f"Processing failed (Pass 1): {e}", "error")
-        return redirect(url_for("index"))
+    # Pass 1 (vertical analysis) runs in the analysis pool; the dashboard polls /status/pass1
+    if _start_job(PASS1_JOBS, up_token):
+        import vertical_analysis
+        digest = UPLOAD_DIGESTS.get(up_token)
+        out_path1 = vertical_analysis.analysis_output_path(tmp_path)
+        if digest and _cache_fetch(digest, "pass1", out_path1):
+            _complete_job(PASS1_JOBS, up_token, out_path1, "Pass1_")
+        else:
+            future = _analysis_pool().submit(vertical_analysis.process, tmp_path)
+            PASS1_JOBS.update_item(up_token, future=future)
+            future.add_done_callback(functools.partial(_finish_job, PASS1_JOBS, up_token, "pass1", "Pass1_"))
 
-    if not out_path1 or not os.path.exists(out_path1):
-        flash("No output produced.", "error")
-        return redirect(url_for("index"))
-
-    token1 = uuid4().hex
-    DOWNLOADS[token1] = (out_path1, f"Pass1_{os.path.basename(out_path1)}")
-    return render_template_string(
-        DASHBOARD_HTML,
-        up_token=up_token,
-        pass1_status="Pass 1 Complete",
-        pass2_status="Ready",
-        pass1_complete=True,
-        pass1_dl_token=token1,
-        pass2_dl_token="",
-        mapping_preview=vertical_analysis.get_last_mapping_preview(),
+    # 202 while the job is still pending; the dashboard keeps polling /status/pass1
+    job = PASS1_JOBS.get(up_token) or {}
+    pass1_done = job.get("status") == "done"
+    html = _render_dashboard(
+        up_token,
+        pass1_status=_job_status_text(job, "Pass 1"),
+        pass2_status="Ready" if pass1_done else "Waiting for Pass 1",
+        pass1_complete=pass1_done,
+        pass1_dl_token=job.get("dl_token") or "",
     )
+    return html, 202 if _job_state(job) in {"queued", "running"} else 200
+
+
+def _finish_job(jobs: StripedDict, up_token: str, kind: str, prefix: str, future: Future) -> None:
+    """Done-callback for pool jobs: cache the output and register it for download."""
+    if up_token not in jobs:
+        return  # reset while running
+    try:
+        out_path = future.result()
+        if not out_path or not os.path.exists(out_path):
+            raise RuntimeError("No output produced")
+    except Exception as e:
+        jobs.update_item(up_token, status="error", error=str(e))
+        _notify_job_change()
+        return
+    digest = UPLOAD_DIGESTS.get(up_token)
+    if digest:
+        _cache_store(digest, kind, out_path)
+    _complete_job(jobs, up_token, out_path, prefix)
 
 
 @app.post("/run/pass2")
 def run_pass2() -> Response:
     up_token = request.form.get("u", "")
-    tmp_path = UPLOADS.get(up_token)
+    tmp_path = _touch_upload(up_token)
     if not tmp_path:
         flash("Upload not found. Please upload your CSV again.", "error")
         return redirect(url_for("index"))
 
-    job = PASS2_JOBS.get(up_token)
-    if not job or job.get("status") in {"error", "done"}:
-        PASS2_JOBS[up_token] = {"status": "queued", "dl_token": None, "error": None}
-
-        def _run():
-            PASS2_JOBS[up_token]["status"] = "running"
-            try:
-                # Prefer Pass 1 output if exists (so signals build on states/modifiers)
-                out_path1 = None
-                for token, (path, name) in list(DOWNLOADS.items()):
-                    if path.startswith(os.path.dirname(tmp_path)) and os.path.basename(path).startswith("Pass1_"):
-                        out_path1 = path
-                        break
-                source_path = out_path1 if out_path1 and os.path.exists(out_path1) else tmp_path
-                out_path2 = process_signals(source_path)
-                if not out_path2 or not os.path.exists(out_path2):
-                    raise RuntimeError("No output produced")
-                token2 = uuid4().hex
-                DOWNLOADS[token2] = (out_path2, f"Pass2_{os.path.basename(out_path2)}")
-                PASS2_JOBS[up_token]["dl_token"] = token2
-                PASS2_JOBS[up_token]["status"] = "done"
-            except Exception as e:
-                PASS2_JOBS[up_token]["status"] = "error"
-                PASS2_JOBS[up_token]["error"] = str(e)
-
-        t = threading.Thread(target=_run, daemon=True)
-        t.start()
-
-    return render_template_string(
-        DASHBOARD_HTML,
-        up_token=up_token,
+    # Pass 2 (signals) runs in the analysis pool alongside other uploads' Pass 1 jobs
+    if _start_job(PASS2_JOBS, up_token):
+        from orchestra_signals_engine import process_signals, signals_output_path
+        # Prefer Pass 1 output if exists (so signals build on states/modifiers)
+        out_path1 = PASS1_OUTPUT.get(up_token)
+        source_path = out_path1 if out_path1 and os.path.exists(out_path1) else tmp_path
+        # Signals over the Pass 1 output and over the raw upload are cached separately
+        digest = UPLOAD_DIGESTS.get(up_token)
+        kind = "pass2" if source_path != tmp_path else "pass2-raw"
+        out_path2 = signals_output_path(source_path)
+        if digest and _cache_fetch(digest, kind, out_path2):
+            _complete_job(PASS2_JOBS, up_token, out_path2, "Pass2_")
+        else:
+            future = _analysis_pool().submit(process_signals, source_path)
+            PASS2_JOBS.update_item(up_token, future=future)
+            future.add_done_callback(functools.partial(_finish_job, PASS2_JOBS, up_token, kind, "Pass2_"))
+
+    job = PASS2_JOBS.get(up_token) or {}
+    html = _render_dashboard(
+        up_token,
         pass1_status="Pass 1 Complete",
-        pass2_status="Pass 2 Running…",
+        pass2_status=_job_status_text(job, "Pass 2"),
         pass1_complete=True,
-        pass1_dl_token="",
-        pass2_dl_token="",
-        mapping_preview=vertical_analysis.get_last_mapping_preview(),
+        pass2_dl_token=job.get("dl_token") or "",
     )
+    return html, 202 if _job_state(job) in {"queued", "running"} else 200
+
+
+@app.get("/status/pass1")
+def pass1_status() -> Response:
+    return _job_status(PASS1_JOBS.get(request.args.get("u", "")), "Pass 1")
 
 
 @app.get("/status/pass2")
 def pass2_status() -> Response:
+    return _job_status(PASS2_JOBS.get(request.args.get("u", "")), "Pass 2")
+
+
+def _gzip_chunks(f) -> Iterator[bytes]:
+    # wbits=31 selects the gzip container rather than raw zlib
+    compressor = zlib.compressobj(DOWNLOAD_GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@app.get("/events/<pass_name>")
+def job_events(pass_name: str) -> Response:
+    """Server-sent events for one upload's Pass 1/Pass 2 job: a message per state change."""
+    jobs, label = {"pass1": (PASS1_JOBS, "Pass 1"), "pass2": (PASS2_JOBS, "Pass 2")}.get(pass_name, (None, ""))
+    if jobs is None:
+        return Response(status=404)
     up_token = request.args.get("u", "")
-    job = PASS2_JOBS.get(up_token)
-    if not job:
-        return jsonify({"status": "idle", "status_text": "Ready"})
-    status = job.get("status") or "idle"
-    status_text = {
-        "queued": "Pass 2 Queued",
-        "running": "Pass 2 Running…",
-        "done": "Pass 2 Complete",
-        "error": f"Failed: {job.get('error','')}",
-    }.get(status, "Ready")
-    return jsonify({"status": status, "status_text": status_text, "dl_token": job.get("dl_token")})
+
+    def stream() -> Iterator[str]:
+        # Each open stream holds a server thread, so it is capped; EventSource reconnects on its own
+        yield "retry: 2000\n\n"
+        last = None
+        now = time.monotonic()
+        deadline, quiet_since = now + JOB_EVENTS_MAX_SECONDS, now
+        while now < deadline:
+            payload = _job_payload(jobs.get(up_token), label)
+            if payload != last:
+                last, quiet_since = payload, now
+                yield f"data: {json.dumps(payload)}\n\n"
+                if payload["status"] in {"done", "error", "idle"}:
+                    return
+            elif now - quiet_since >= JOB_EVENTS_HEARTBEAT:
+                quiet_since = now
+                yield ": keepalive\n\n"
+            with _JOB_CHANGED:
+                _JOB_CHANGED.wait(JOB_EVENTS_RECHECK)
+            now = time.monotonic()
+
+    resp = Response(stream(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
 
 @app.get("/download/<token>")
@@ -357,53 +991,72 @@ def download_token(token: str) -> Response:
     if not item:
         flash("Download expired or invalid.", "error")
         return redirect(url_for("index"))
-    path, suggest = item
-    if not os.path.exists(path):
+    path, suggest, _ = item
+    # Open first and size the open file: one lookup, and no window between check and use
+    try:
+        f = open(path, "rb")
+    except OSError:
         flash("File not found.", "error")
         return redirect(url_for("index"))
-    return send_file(path, mimetype="text/csv", as_attachment=True, download_name=suggest)
+    size = os.fstat(f.fileno()).st_size
+    gzip_ok = bool(request.accept_encodings["gzip"]) and size >= DOWNLOAD_GZIP_MIN_SIZE
+    if not gzip_ok and (X_ACCEL_REDIRECT_PREFIX or app.config["USE_X_SENDFILE"]):
+        f.close()
+    if X_ACCEL_REDIRECT_PREFIX and not gzip_ok:
+        resp = Response(mimetype="text/csv")
+        resp.headers["X-Accel-Redirect"] = X_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + os.path.relpath(path, WORK_ROOT)
+        resp.headers.set("Content-Disposition", "attachment", filename=suggest)
+        return resp
+    if app.config["USE_X_SENDFILE"] and not gzip_ok:
+        return send_file(path, mimetype="text/csv", as_attachment=True, download_name=suggest)
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    if gzip_ok:
+        resp = Response(_gzip_chunks(f), mimetype="text/csv", direct_passthrough=True)
+        resp.content_encoding = "gzip"
+    else:
+        # The server's wsgi.file_wrapper (sendfile under gunicorn) when present, else fixed-size reads
+        resp = Response(wrap_file(request.environ, f, DOWNLOAD_CHUNK_SIZE), mimetype="text/csv", direct_passthrough=True)
+        resp.content_length = size
+    resp.vary.add("Accept-Encoding")
+    resp.call_on_close(f.close)
+    resp.headers.set("Content-Disposition", "attachment", filename=suggest)
+    return resp
 
 
 @app.post("/reset")
 def reset() -> Response:
     up_token = request.form.get("u", "")
     
-    # Clean up uploaded file
-    tmp_path = UPLOADS.pop(up_token, None)
-    if tmp_path and os.path.exists(tmp_path):
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass  # Ignore cleanup errors
-    
-    # Clean up associated downloads
-    to_remove = []
-    for token, (path, name) in DOWNLOADS.items():
-        if tmp_path and path.startswith(os.path.dirname(tmp_path)):
-            to_remove.append(token)
-            try:
-                os.unlink(path)
-            except OSError:
-                pass  # Ignore cleanup errors
-    
-    for token in to_remove:
-        DOWNLOADS.pop(token, None)
-    
-    # Clean up Pass 2 jobs
-    PASS2_JOBS.pop(up_token, None)
+    _discard_upload(up_token)
     
     flash("Session reset. Please upload a new CSV file.", "success")
     return redirect(url_for("index"))
 
 
+# Repute logo stored in project root; read once at import and cached by browsers for a day
+_LOGO_PATH = os.path.join(app.root_path, "Repute Logo Only No Text.jpg")
+try:
+    with open(_LOGO_PATH, "rb") as _logo_file:
+        _LOGO_BYTES: Optional[bytes] = _logo_file.read()
+    _LOGO_ETAG = hashlib.blake2b(_LOGO_BYTES, digest_size=16).hexdigest()
+    _LOGO_MTIME = os.path.getmtime(_LOGO_PATH)
+except OSError:
+    _LOGO_BYTES = None
+LOGO_MAX_AGE = 86400
+
+
 @app.get("/logo")
 def logo() -> Response:
-    # Serve the Repute logo stored in project root
-    path = os.path.join(os.path.dirname(__file__), "Repute Logo Only No Text.jpg")
-    if os.path.exists(path):
-        return send_file(path, mimetype="image/jpeg")
-    # Fallback: simple 1x1 pixel if logo not found
-    return Response(status=404)
+    if _LOGO_BYTES is None:
+        return Response(status=404)
+    # Served from memory; revalidations are answered with 304
+    resp = Response(_LOGO_BYTES, mimetype="image/jpeg")
+    resp.set_etag(_LOGO_ETAG)
+    resp.last_modified = _LOGO_MTIME
+    resp.cache_control.public = True
+    resp.cache_control.max_age = LOGO_MAX_AGE
+    return resp.make_conditional(request)
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", "8000"))
@@ -3,8 +3,14 @@ Pass 2: Signals engine for topics, narratives, and entities (windowed + article-
 Outputs additional *_Signals columns; source CSV remains unchanged.
 """
 
+import heapq
+import os
+import re
+import warnings
 from datetime import timedelta
-from typing import List, Tuple
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -48,26 +54,44 @@ ENTITY_SIGNAL_WEIGHTS = {
     "Cautious Schadenfreude": (5, 2),
 }
 
+# Modifier classes tested by the entity rules, as bit flags (a label can belong to several)
+MOD_SHAPING = 1  # Narrative Shaping for the entity carrying it
+MOD_PEER_SHAPER = 2  # exposes the other entities in the article (Ricochet Risk)
+MOD_TAKEDOWN = 4
+MOD_BREAKTHROUGH = 8
+MODIFIER_FLAGS = {
+    "Takedown": MOD_SHAPING | MOD_PEER_SHAPER | MOD_TAKEDOWN,
+    "Breakthrough": MOD_SHAPING | MOD_BREAKTHROUGH,
+    "Narrative Shaper": MOD_PEER_SHAPER,
+    "Body Blow": MOD_PEER_SHAPER,
+    "Stinger": MOD_PEER_SHAPER,
+    "Collateral Damage": MOD_PEER_SHAPER,
+}
+
 
 # ------------------------------
 # Helpers
 # ------------------------------
 def _ensure_datetime(df: pd.DataFrame, date_col: str = "Date") -> pd.DataFrame:
     if date_col in df.columns and not np.issubdtype(df[date_col].dtype, np.datetime64):
+        # Many articles share a date, so each parse attempt only sees the distinct values
+        codes, uniques = pd.factorize(df[date_col])
+        values = pd.Series(uniques, dtype=object)
+
         # Prefer fast, fixed-format parse; try common formats before generic fallback
-        parsed = pd.to_datetime(df[date_col], format="%Y-%m-%d", errors="coerce")
+        parsed = pd.to_datetime(values, format="%Y-%m-%d", errors="coerce")
 
         if parsed.isna().all():
             for fmt in ("%m/%d/%Y", "%m/%d/%y", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S"):
-                alt = pd.to_datetime(df[date_col], format=fmt, errors="coerce")
+                alt = pd.to_datetime(values, format=fmt, errors="coerce")
                 if not alt.isna().all():
                     parsed = alt
                     break
 
         if parsed.isna().all():
             # Final fallback: generic parse (may be slower)
-            parsed = pd.to_datetime(df[date_col], errors="coerce")
-        df[date_col] = parsed
+            parsed = pd.to_datetime(values, errors="coerce")
+        df[date_col] = pd.Series(parsed.array.take(codes, allow_fill=True), index=df.index)
     return df
 
 
@@ -96,67 +120,104 @@ def _normalize_headers(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def _window_splits(
+def _window_bounds(
     df: pd.DataFrame, date_col: str = "Date", as_of: pd.Timestamp | None = None
-) -> Tuple[pd.DataFrame, pd.DataFrame, Tuple[pd.Timestamp, pd.Timestamp], Tuple[pd.Timestamp, pd.Timestamp]]:
+) -> Tuple[Tuple[pd.Timestamp, pd.Timestamp], Tuple[pd.Timestamp, pd.Timestamp]]:
     df = _ensure_datetime(df, date_col)
     max_date = pd.to_datetime(as_of) if as_of is not None else df[date_col].max()
     current_start = max_date - pd.Timedelta(days=WINDOW_DAYS - 1)
     prior_start = current_start - pd.Timedelta(days=WINDOW_DAYS)
     prior_end = current_start - pd.Timedelta(days=1)
-    df_current = df[(df[date_col] >= current_start) & (df[date_col] <= max_date)].copy()
-    df_prior = df[(df[date_col] >= prior_start) & (df[date_col] <= prior_end)].copy()
-    return df_current, df_prior, (current_start, max_date), (prior_start, prior_end)
+    return (current_start, max_date), (prior_start, prior_end)
+
+
+def _window_masks(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Boolean row masks for the current and prior windows.
+
+    apply_all_signals builds them once and hands them to every compute_* pass.
+    """
+    cur_win, prev_win = _window_bounds(df)
+    dates = df["Date"].to_numpy(dtype="datetime64[ns]")
+    masks = (np.zeros(len(dates), dtype=bool), np.zeros(len(dates), dtype=bool))
+    if any(pd.isna(bound) for bound in (*cur_win, *prev_win)):
+        return masks  # no usable dates at all
+    lows = np.array([cur_win[0], prev_win[0]], dtype="datetime64[ns]")
+    highs = np.array([cur_win[1], prev_win[1]], dtype="datetime64[ns]")
+    # Exports usually arrive in date order; then each window is one contiguous run, and both windows'
+    # ends come from one bisection call per side
+    if bool(df["Date"].is_monotonic_increasing) and not np.isnat(dates).any():
+        starts = np.searchsorted(dates, lows, side="left")
+        ends = np.searchsorted(dates, highs, side="right")
+        for mask, start, end in zip(masks, starts, ends):
+            mask[start:end] = True
+        return masks
+    return (dates >= lows[0]) & (dates <= highs[0]), (dates >= lows[1]) & (dates <= highs[1])
+
+
+def _window_rows(mask: np.ndarray):
+    """Indexer for a window's rows: a slice when they form one contiguous run (date-ordered input),
+    so whole-window reductions read a view instead of gathering a copy; otherwise the mask itself."""
+    rows = np.flatnonzero(mask)
+    if rows.size and rows[-1] - rows[0] + 1 == rows.size:
+        return slice(int(rows[0]), int(rows[-1]) + 1)
+    return mask
+
+
+def _numeric_values(values) -> np.ndarray:
+    """Numeric values as a float ndarray with NaNs dropped; non-numeric entries count as NaN."""
+    arr = np.asarray(values)
+    if arr.dtype.kind not in "fiub":
+        arr = pd.to_numeric(pd.Series(arr.ravel(), dtype=object), errors="coerce").to_numpy()
+    arr = arr.astype(np.float64, copy=False)
+    return arr[~np.isnan(arr)]
 
 
 def _mean_safe(series) -> float:
-    # Accept Series, list, ndarray; coerce to numeric Series
-    s = pd.Series(series)
-    s = pd.to_numeric(s, errors="coerce")
-    s = s.dropna()
-    return float(s.mean()) if len(s) else np.nan
+    # Accept Series, list, ndarray
+    a = _numeric_values(series)
+    return float(a.mean()) if a.size else np.nan
+
+
+def _median_safe(series) -> float:
+    a = _numeric_values(series)
+    return float(np.median(a)) if a.size else np.nan
 
 
 def _std_safe(series: pd.Series) -> float:
-    s = pd.to_numeric(series, errors="coerce")
-    s = s.dropna()
-    return float(s.std(ddof=0)) if len(s) else 0.0
+    a = _numeric_values(series)
+    return float(a.std()) if a.size else 0.0
+
 
+_NARRATIVE_COL = re.compile(r"^O_M_(\d+)")
+_ENTITY_COL = re.compile(r"^(\d+)_C_")
 
-def _iqr_safe(series: pd.Series) -> float:
-    s = pd.to_numeric(series, errors="coerce").dropna()
-    if s.empty:
-        return 0.0
-    q3, q1 = np.percentile(s, [75, 25])
-    return float(q3 - q1)
+
+@lru_cache(maxsize=16)
+def _coded_ids(pattern: re.Pattern, columns: Tuple[str, ...]) -> Tuple[int, ...]:
+    ids = set()
+    for col in columns:
+        match = pattern.match(str(col))
+        if match:
+            ids.add(int(match.group(1)))
+    return tuple(sorted(ids))
 
 
 def _get_narratives(df: pd.DataFrame) -> List[int]:
     """Discover narrative IDs from coded column patterns like O_M_1prom, O_M_2prom, etc."""
-    import re
-    narrative_ids = set()
-    for col in df.columns:
-        match = re.match(r'^O_M_(\d+)', col)
-        if match:
-            narrative_ids.add(int(match.group(1)))
-    return sorted(narrative_ids)
+    return list(_coded_ids(_NARRATIVE_COL, tuple(df.columns)))
 
 
 def _get_entities(df: pd.DataFrame) -> List[int]:
     """Discover entity IDs from coded column patterns like 1_C_Prom, 2_C_Prom, etc."""
-    import re
-    entity_ids = set()
-    for col in df.columns:
-        match = re.match(r'^(\d+)_C_', col)
-        if match:
-            entity_ids.add(int(match.group(1)))
-    return sorted(entity_ids)
+    return list(_coded_ids(_ENTITY_COL, tuple(df.columns)))
 
 
+@lru_cache(maxsize=1024)
 def _narr_cols(narrative_id: int) -> Tuple[str, str]:
     return f"O_M_{narrative_id}prom", f"O_M_{narrative_id}sent"
 
 
+@lru_cache(maxsize=1024)
 def _entity_cols(entity_id: int) -> Tuple[str, str, str, str, str, str]:
     # returns (prom, sent, qual, state, modifier, signals_colname)
     return (
@@ -169,43 +230,123 @@ def _entity_cols(entity_id: int) -> Tuple[str, str, str, str, str, str]:
     )
 
 
-def _count_distinct_publications(rows: pd.DataFrame) -> int:
-    return rows["Publication"].dropna().astype(str).nunique()
+def _row_floats(df: pd.DataFrame, cols: List[str]) -> np.ndarray:
+    """(rows, cols) float matrix of the given columns; missing columns read as 0, NaN cells stay NaN."""
+    out = np.zeros((len(df), len(cols)))
+    for j, col in enumerate(cols):
+        if col in df.columns:
+            out[:, j] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+    return out
+
+
+def _prom_matrix(df: pd.DataFrame, cols: List[str]) -> np.ndarray:
+    """_row_floats for prominence scores, held as float32 when that loses nothing (0-5 in half steps).
+
+    Rules only compare these cells with thresholds and with each other; means upcast to float64.
+    """
+    out = _row_floats(df, cols)
+    out32 = out.astype(np.float32)
+    return out32 if np.array_equal(out32, out, equal_nan=True) else out
+
+
+def _score_matrices(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Narrative and entity prominence/sentiment matrices, one column per discovered ID.
+
+    apply_all_signals() extracts them once and hands them to every pass, since the signal columns
+    the passes add never change them.
+    """
+    narratives = _get_narratives(df)
+    entities = _get_entities(df)
+    return {
+        "narr_prom": _prom_matrix(df, [_narr_cols(n)[0] for n in narratives]),
+        "narr_sent": _row_floats(df, [_narr_cols(n)[1] for n in narratives]),
+        "ent_prom": _prom_matrix(df, [_entity_cols(e)[0] for e in entities]),
+        "ent_sent": _row_floats(df, [_entity_cols(e)[1] for e in entities]),
+    }
+
+
+def _signal_lists(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Object array with a separate signal list per row, seeded from any values ``col`` already holds.
+
+    Rows are appended to in place and the array is stored back as the column without re-inference.
+    """
+    out = np.empty(len(df), dtype=object)
+    if col not in df.columns:
+        for i in range(len(out)):
+            out[i] = []
+        return out
+    values = df[col].to_numpy(dtype=object)
+    missing = pd.isna(values)
+    for i, v in enumerate(values):
+        out[i] = list(v) if isinstance(v, list) else ([] if missing[i] else [str(v)])
+    return out
+
+
+def _text_codes(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Category codes and labels for ``values`` compared as text (what ``astype(str)`` would group).
+
+    Only the distinct values are converted to text; missing values get the label "nan". Unlike a
+    per-row ``astype(str)``, objects that compare equal (``1`` and ``1.0``) share a code, which only
+    matters for mixed-type in-memory frames.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    text_codes, labels = pd.factorize(pd.Index(uniques, dtype=object).astype(str))
+    return text_codes[codes], np.asarray(labels, dtype=object)
+
+
+def _publication_codes(df: pd.DataFrame) -> np.ndarray:
+    """Integer ID per row's publication (compared as text); -1 where it is missing."""
+    pubs = df["Publication"]
+    codes = _text_codes(pubs)[0]
+    codes[pubs.isna().to_numpy()] = -1
+    return codes
+
+
+def _count_distinct(codes: np.ndarray) -> int:
+    codes = codes[codes >= 0]
+    return int(np.count_nonzero(np.bincount(codes))) if codes.size else 0
 
 
 # ------------------------------
 # Topic signals
 # ------------------------------
-def compute_topic_signals(df: pd.DataFrame) -> pd.DataFrame:
-    df_cur, df_prev, cur_win, _ = _window_splits(df)
+def compute_topic_signals(
+    df: pd.DataFrame,
+    windows: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    mats: Optional[Dict[str, np.ndarray]] = None,
+) -> pd.DataFrame:
+    cur_base, prev_base = windows if windows is not None else _window_masks(df)
+    mats = mats if mats is not None else _score_matrices(df)
     topic_prom, topic_sent = "O_Sent", "O_Sent"  # Using coded topic columns
-    vol_cur = len(df_cur)
-    vol_prev = len(df_prev)
-    avg_prom_low = _mean_safe(df_cur.loc[df_cur["Orchestra_Pub_Tier"].isin(LOW_TIER), topic_prom]) if vol_cur else np.nan
-    avg_prom_mh = _mean_safe(df_cur.loc[df_cur["Orchestra_Pub_Tier"].isin(MID_HIGH_TIER), topic_prom]) if vol_cur else np.nan
-    std_prom = _std_safe(df_cur[topic_prom]) if vol_cur else 0.0
-    std_sent = _std_safe(df_cur[topic_sent]) if vol_cur else 0.0
+    vol_cur = int(cur_base.sum())
+    vol_prev = int(prev_base.sum())
+    prom_vals = df[topic_prom].to_numpy()
+    sent_vals = df[topic_sent].to_numpy()
+    low_tier = df["Orchestra_Pub_Tier"].isin(LOW_TIER).to_numpy()
+    mid_high_tier = df["Orchestra_Pub_Tier"].isin(MID_HIGH_TIER).to_numpy()
+    avg_prom_low = _mean_safe(prom_vals[cur_base & low_tier]) if vol_cur else np.nan
+    avg_prom_mh = _mean_safe(prom_vals[cur_base & mid_high_tier]) if vol_cur else np.nan
+    cur_rows = _window_rows(cur_base)
+    std_prom = _std_safe(prom_vals[cur_rows]) if vol_cur else 0.0
+    std_sent = _std_safe(sent_vals[cur_rows]) if vol_cur else 0.0
 
     # no-narrative share in window
     narratives = _get_narratives(df)
-    if narratives:
-        no_narr_mask = (df_cur[[f"O_M_{n}prom" for n in narratives]] > 0).sum(axis=1) == 0
+    if narratives and vol_cur:
+        no_narr_mask = ~(mats["narr_prom"][cur_rows] > 0).any(axis=1)
         share_no_narr = float(no_narr_mask.mean())
     else:
         share_no_narr = 0.0
-    share_low_tier = float((df_cur["Orchestra_Pub_Tier"].isin(LOW_TIER)).mean()) if vol_cur else 0.0
-    avg_topic_prom = _mean_safe(df_cur[topic_prom]) if vol_cur else np.nan
+    share_low_tier = float(low_tier[cur_rows].mean()) if vol_cur else 0.0
+    avg_topic_prom = _mean_safe(prom_vals[cur_rows]) if vol_cur else np.nan
 
-    # init column (dataset-level attaches as a constant per row; we still store on each row for CSV usability)
-    if "O_signals" not in df.columns:
-        df["O_signals"] = [[] for _ in range(len(df))]
-    else:
-        df["O_signals"] = df["O_signals"].apply(lambda v: v if isinstance(v, list) else ([] if pd.isna(v) else [str(v)]))
+    # Signal lists are built in place and stored once (dataset-level signals are still repeated
+    # on each row for CSV usability)
+    topic_signals = _signal_lists(df, "O_signals")
 
     # Article-level Hot retained, but other topic signals are dataset-level per window
-    hot_mask = (df[topic_prom] >= 3.5) & (df[topic_sent] >= 3.0)
-    if hot_mask.any():
-        df.loc[hot_mask, "O_signals"] = df.loc[hot_mask, "O_signals"].apply(lambda s: s + ["Hot"])
+    for i in np.flatnonzero((prom_vals >= 3.5) & (sent_vals >= 3.0)):
+        topic_signals[i].append("Hot")
 
     # Windowed signals (copy to all rows for convenience)
     topic_window_signals: List[str] = []
@@ -220,85 +361,92 @@ def compute_topic_signals(df: pd.DataFrame) -> pd.DataFrame:
     if (not np.isnan(avg_topic_prom)) and (avg_topic_prom >= 2.5) and (share_no_narr >= 0.30) and (share_low_tier >= 0.60):
         topic_window_signals.append("Coverage Split")
     if topic_window_signals:
-        const = topic_window_signals
-        df["O_signals"] = df["O_signals"].apply(lambda s: s + const)
+        for row_signals in topic_signals:
+            row_signals.extend(topic_window_signals)
+    df["O_signals"] = topic_signals
     return df
 
 
 # ------------------------------
 # Narrative signals
 # ------------------------------
-def compute_narrative_signals(df: pd.DataFrame) -> pd.DataFrame:
-    df_cur, df_prev, cur_win, prev_win = _window_splits(df)
+def compute_narrative_signals(
+    df: pd.DataFrame,
+    windows: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    mats: Optional[Dict[str, np.ndarray]] = None,
+) -> pd.DataFrame:
+    cur_base, prev_base = windows if windows is not None else _window_masks(df)
+    mats = mats if mats is not None else _score_matrices(df)
     narratives = _get_narratives(df)
-    for n in narratives:
-        prom_col, sent_col = _narr_cols(n)
+    entities = _get_entities(df)
+    # Raw column arrays; the window statistics below index them with row masks
+    narr_mat, narr_sent_mat, ent_prom = mats["narr_prom"], mats["narr_sent"], mats["ent_prom"]
+    # Per-row counts shared by every narrative's Overlapping/Coverage Split/Unowned/Media-Led shares
+    narr_present_count = (narr_mat > 0).sum(axis=1)
+    narr_strong_count = (narr_mat >= 2.0).sum(axis=1)
+    owner_count = (ent_prom >= 2.5).sum(axis=1)
+    low_tier = df["Orchestra_Pub_Tier"].isin(LOW_TIER).to_numpy()
+    mid_high_tier = df["Orchestra_Pub_Tier"].isin(MID_HIGH_TIER).to_numpy()
+    for k, n in enumerate(narratives):
+        prom_arr = narr_mat[:, k]
+        sent_arr = narr_sent_mat[:, k]
         outcol = f"O_M_{n}signals"
-        if outcol not in df.columns:
-            df[outcol] = [[] for _ in range(len(df))]
-        else:
-            df[outcol] = df[outcol].apply(lambda v: v if isinstance(v, list) else ([] if pd.isna(v) else [str(v)]))
+        narr_signals = _signal_lists(df, outcol)
 
         # Article-level Hot
-        hot_mask = (df[prom_col] >= 3.5) & (df[sent_col] >= 3.0)
-        if hot_mask.any():
-            df.loc[hot_mask, outcol] = df.loc[hot_mask, outcol].apply(lambda s: s + ["Hot"])
+        for i in np.flatnonzero((prom_arr >= 3.5) & (sent_arr >= 3.0)):
+            narr_signals[i].append("Hot")
 
         # Window masks
-        cur_mask = (df["Date"] >= cur_win[0]) & (df["Date"] <= cur_win[1]) & (df[prom_col].notna())
-        prev_mask = (df["Date"] >= prev_win[0]) & (df["Date"] <= prev_win[1]) & (df[prom_col].notna())
+        has_prom = ~np.isnan(prom_arr)
+        cur_mask = cur_base & has_prom
+        prev_mask = prev_base & has_prom
         vol_cur = int(cur_mask.sum())
         vol_prev = int(prev_mask.sum())
 
         narr_window_signals: List[str] = []
-        share_with_narr = float((df.loc[cur_mask, prom_col] > 0).mean()) if vol_cur else 0.0
-        share_prom_ge_2_5 = float((df.loc[cur_mask, prom_col] >= 2.5).mean()) if vol_cur else 0.0
+        share_with_narr = float((prom_arr[cur_mask] > 0).mean()) if vol_cur else 0.0
+        share_prom_ge_2_5 = float((prom_arr[cur_mask] >= 2.5).mean()) if vol_cur else 0.0
         if share_with_narr >= 0.66 or share_prom_ge_2_5 >= 0.50:
             narr_window_signals.append("Dominant")
 
-        entities = _get_entities(df)
         if entities and vol_cur:
             # Captured / Unowned / Media-Led
-            narr_rows_prom = df.loc[cur_mask & (df[prom_col] >= 2.5)]
-            if not narr_rows_prom.empty:
+            rows_prom = cur_mask & (prom_arr >= 2.5)
+            if rows_prom.any():
                 # Captured
-                shares = {}
-                for e in entities:
-                    e_prom = _entity_cols(e)[0]
-                    shares[e] = float((narr_rows_prom[e_prom] >= 2.5).mean())
-                if shares and max(shares.values()) >= 0.50:
+                if (ent_prom[rows_prom] >= 2.5).mean(axis=0).max() >= 0.50:
                     narr_window_signals.append("Captured")
                 # Unowned
-                no_owner_share = float(((narr_rows_prom[[_entity_cols(e)[0] for e in entities]] >= 2.5).sum(axis=1) == 0).mean())
+                no_owner_share = float((owner_count[rows_prom] == 0).mean())
                 if no_owner_share >= 0.50:
                     narr_window_signals.append("Unowned")
             # Media-Led on any narrative-present article
-            narr_rows_all = df.loc[cur_mask & (df[prom_col] > 0)]
-            if not narr_rows_all.empty:
-                media_led_share = float(((narr_rows_all[[_entity_cols(e)[0] for e in entities]] >= 2.5).sum(axis=1) == 0).mean())
+            rows_all = cur_mask & (prom_arr > 0)
+            if rows_all.any():
+                media_led_share = float((owner_count[rows_all] == 0).mean())
                 if media_led_share >= 0.50:
                     narr_window_signals.append("Media-Led")
 
         # Fragmented, Overlapping, Trade-Locked, Coverage Split
         if vol_cur:
-            std_prom = _std_safe(df.loc[cur_mask, prom_col])
-            std_sent = _std_safe(df.loc[cur_mask, sent_col])
+            std_prom = _std_safe(prom_arr[cur_mask])
+            std_sent = _std_safe(sent_arr[cur_mask])
             if std_prom >= 1.0 or std_sent >= 1.5:
                 narr_window_signals.append("Fragmented")
             if narratives:
-                narr_prom_cols = [f"O_M_{nn}prom" for nn in narratives]
-                overlap_share = float(((df.loc[cur_mask, narr_prom_cols] >= 2.0).sum(axis=1) >= 2).mean())
+                overlap_share = float((narr_strong_count[cur_mask] >= 2).mean())
                 if overlap_share >= 0.30:
                     narr_window_signals.append("Overlapping")
-            avg_prom_low = _mean_safe(df.loc[cur_mask & df["Orchestra_Pub_Tier"].isin(LOW_TIER), prom_col])
-            avg_prom_mh = _mean_safe(df.loc[cur_mask & df["Orchestra_Pub_Tier"].isin(MID_HIGH_TIER), prom_col])
+            avg_prom_low = _mean_safe(prom_arr[cur_mask & low_tier])
+            avg_prom_mh = _mean_safe(prom_arr[cur_mask & mid_high_tier])
             if (not np.isnan(avg_prom_low)) and (not np.isnan(avg_prom_mh)) and avg_prom_low >= 2.5 and avg_prom_mh < 1.5:
                 narr_window_signals.append("Trade-Locked")
-            avg_prom = _mean_safe(df.loc[cur_mask, prom_col])
+            avg_prom = _mean_safe(prom_arr[cur_mask])
             if narratives:
-                other_cols = [f"O_M_{nn}prom" for nn in narratives if nn != n]
-                no_companion_share = float(((df.loc[cur_mask, other_cols] > 0).sum(axis=1) == 0).mean()) if other_cols else 1.0
-                low_tier_share = float((df.loc[cur_mask, "Orchestra_Pub_Tier"].isin(LOW_TIER)).mean())
+                companions = narr_present_count[cur_mask] - (prom_arr[cur_mask] > 0)
+                no_companion_share = float((companions == 0).mean()) if len(narratives) > 1 else 1.0
+                low_tier_share = float(low_tier[cur_mask].mean())
                 if (avg_prom >= 2.5) and (no_companion_share >= 0.30) and (low_tier_share >= 0.60):
                     narr_window_signals.append("Coverage Split")
 
@@ -310,10 +458,10 @@ def compute_narrative_signals(df: pd.DataFrame) -> pd.DataFrame:
         if vol_cur == 0:
             narr_window_signals.append("Dead")
         if vol_cur and vol_prev:
-            avg_sent_cur = _mean_safe(df.loc[cur_mask, sent_col])
-            avg_sent_prev = _mean_safe(df.loc[prev_mask, sent_col])
-            avg_prom_cur = _mean_safe(df.loc[cur_mask, prom_col])
-            avg_prom_prev = _mean_safe(df.loc[prev_mask, prom_col])
+            avg_sent_cur = _mean_safe(sent_arr[cur_mask])
+            avg_sent_prev = _mean_safe(sent_arr[prev_mask])
+            avg_prom_cur = _mean_safe(prom_arr[cur_mask])
+            avg_prom_prev = _mean_safe(prom_arr[prev_mask])
             if (avg_sent_cur - avg_sent_prev) >= 1.5 or (avg_prom_cur >= 1.30 * avg_prom_prev):
                 narr_window_signals.append("Strengthening")
             if (avg_sent_prev - avg_sent_cur) >= 1.5:
@@ -323,10 +471,9 @@ def compute_narrative_signals(df: pd.DataFrame) -> pd.DataFrame:
 
         # Attach dataset-level narrative status only to rows where this narrative is present (>0)
         if narr_window_signals:
-            present_mask = df[prom_col] > 0
-            if present_mask.any():
-                const = narr_window_signals
-                df.loc[present_mask, outcol] = df.loc[present_mask, outcol].apply(lambda s: s + const)
+            for i in np.flatnonzero(prom_arr > 0):
+                narr_signals[i].extend(narr_window_signals)
+        df[outcol] = narr_signals
     return df
 
 
@@ -334,290 +481,291 @@ def compute_narrative_signals(df: pd.DataFrame) -> pd.DataFrame:
 # Entity signals
 # ------------------------------
 def _rank_and_cap_entity_signals(signals_with_meta: List[tuple]) -> List[str]:
+    # (name, sev, struc) triples of one (article, entity) cell. Outlet tier, prominence and recency
+    # are the cell's own and equal for every candidate, so they never reorder it and are left out.
     if not signals_with_meta:
         return []
-    df_rank = pd.DataFrame(
-        signals_with_meta,
-        columns=["name", "sev", "struc", "outlet", "prom", "recency"],
-    )  # type: ignore
-    # Coerce to numeric to avoid mixed-type sort errors in some environments
-    for col in ("sev", "struc", "outlet", "prom", "recency"):
-        df_rank[col] = pd.to_numeric(df_rank[col], errors="coerce")
-    df_rank["name"] = df_rank["name"].astype(str)
-    # Fill NaNs with safe defaults for ranking
-    df_rank[["sev", "struc", "outlet", "prom", "recency"]] = df_rank[["sev", "struc", "outlet", "prom", "recency"]].fillna(0)
-    df_rank = df_rank.sort_values(
-        by=["sev", "struc", "outlet", "prom", "recency"],
-        ascending=[False, False, False, False, False],
-        kind="mergesort",
-    )
-    return df_rank["name"].tolist()[:ENTITY_SIGNAL_CAP]
+    # nlargest keeps emission order among ties, like a stable descending sort
+    return [str(t[0]) for t in heapq.nlargest(ENTITY_SIGNAL_CAP, signals_with_meta, key=itemgetter(1, 2))]
 
 
-def compute_entity_signals(df: pd.DataFrame) -> pd.DataFrame:
-    df_cur, df_prev, cur_win, prev_win = _window_splits(df)
+def compute_entity_signals(
+    df: pd.DataFrame,
+    windows: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    mats: Optional[Dict[str, np.ndarray]] = None,
+) -> pd.DataFrame:
+    cur_base, prev_base = windows if windows is not None else _window_masks(df)
+    mats = mats if mats is not None else _score_matrices(df)
     entities = _get_entities(df)
     narratives = _get_narratives(df)
+    # Column names per entity, formatted once rather than inside the loops
+    ent_cols = {e: _entity_cols(e) for e in entities}
+
+    # Raw column matrices; window statistics and article rules index into them
+    n_rows = len(df)
+    prom_mat, sent_mat = mats["ent_prom"], mats["ent_sent"]
+    # Modifiers as MODIFIER_FLAGS bits, looked up once per distinct label
+    mod_bits = np.zeros((n_rows, len(entities)), dtype=np.uint8)
+    for j, e in enumerate(entities):
+        e_mod = ent_cols[e][4]
+        if e_mod in df.columns:
+            mod_codes, mod_labels = _text_codes(df[e_mod])
+            mod_bits[:, j] = np.array([MODIFIER_FLAGS.get(label, 0) for label in mod_labels], dtype=np.uint8)[mod_codes]
+    narr_mat, narr_sent_mat = mats["narr_prom"], mats["narr_sent"]
+    pub_codes = _publication_codes(df)
+    outlet_arr = (
+        pd.to_numeric(df["Orchestra_Pub_Tier"], errors="coerce").fillna(0).to_numpy().astype(np.int64)
+        if "Orchestra_Pub_Tier" in df.columns else np.zeros(n_rows, dtype=np.int64)
+    )
+    if outlet_arr.size and np.iinfo(np.int8).min <= outlet_arr.min() and outlet_arr.max() <= np.iinfo(np.int8).max:
+        outlet_arr = outlet_arr.astype(np.int8)  # tiers are 1-5; one byte per row for the broadcast rule masks
 
     # Precompute narrative gaining prominence flags
     narr_gain: dict[str, bool] = {}
-    for n in narratives:
-        prm, _ = _narr_cols(n)
-        cur_mask = (df["Date"] >= cur_win[0]) & (df["Date"] <= cur_win[1]) & df[prm].notna()
-        prev_mask = (df["Date"] >= prev_win[0]) & (df["Date"] <= prev_win[1]) & df[prm].notna()
-        avg_prom_cur = _mean_safe(df.loc[cur_mask, prm])
-        avg_prom_prev = _mean_safe(df.loc[prev_mask, prm])
+    for k, n in enumerate(narratives):
+        prom_arr = narr_mat[:, k]
+        has_prom = ~np.isnan(prom_arr)
+        avg_prom_cur = _mean_safe(prom_arr[cur_base & has_prom])
+        avg_prom_prev = _mean_safe(prom_arr[prev_base & has_prom])
         narr_gain[n] = (avg_prom_prev > 0) and (avg_prom_cur >= 1.30 * avg_prom_prev)
 
     # Per-entity window stats
     stats: dict[str, dict] = {}
-    for e in entities:
-        e_prom, e_sent, e_q, e_state, e_mod, e_sig = _entity_cols(e)
-        cur_mask = (df["Date"] >= cur_win[0]) & (df["Date"] <= cur_win[1]) & df[e_prom].notna()
-        prev_mask = (df["Date"] >= prev_win[0]) & (df["Date"] <= prev_win[1]) & df[e_prom].notna()
+    for j, e in enumerate(entities):
+        e_prom, e_sent, e_q, e_state, e_mod, e_sig = ent_cols[e]
+        has_prom = ~np.isnan(prom_mat[:, j])
+        cur_mask = cur_base & has_prom
+        prev_mask = prev_base & has_prom
+        q_arr = _row_floats(df, [e_q])[:, 0] if e_q in df.columns else None
         stats[e] = {
-            "avg_prom_cur": _mean_safe(df.loc[cur_mask, e_prom]),
-            "avg_prom_prev": _mean_safe(df.loc[prev_mask, e_prom]),
-            "avg_sent_cur": _mean_safe(df.loc[cur_mask, e_sent]),
-            "avg_sent_prev": _mean_safe(df.loc[prev_mask, e_sent]),
-            "avg_q_cur": _mean_safe(df.loc[cur_mask, e_q]) if e_q in df.columns else np.nan,
-            "avg_q_prev": _mean_safe(df.loc[prev_mask, e_q]) if e_q in df.columns else np.nan,
-            "had_HST_prev": (e_mod in df.columns) and (df.loc[prev_mask, e_mod].astype(str).eq("Takedown").any()),
-            "had_Breakthrough_prev": (e_mod in df.columns) and (df.loc[prev_mask, e_mod].astype(str).eq("Breakthrough").any()),
+            "avg_prom_cur": _mean_safe(prom_mat[cur_mask, j]),
+            "avg_prom_prev": _mean_safe(prom_mat[prev_mask, j]),
+            "avg_sent_cur": _mean_safe(sent_mat[cur_mask, j]),
+            "avg_sent_prev": _mean_safe(sent_mat[prev_mask, j]),
+            "avg_q_cur": _mean_safe(q_arr[cur_mask]) if q_arr is not None else np.nan,
+            "avg_q_prev": _mean_safe(q_arr[prev_mask]) if q_arr is not None else np.nan,
+            "had_HST_prev": bool((mod_bits[prev_mask, j] & MOD_TAKEDOWN).any()),
+            "had_Breakthrough_prev": bool((mod_bits[prev_mask, j] & MOD_BREAKTHROUGH).any()),
         }
 
-    # Ensure signal columns
-    for e in entities:
-        sig_col = _entity_cols(e)[5]
-        if sig_col not in df.columns:
-            df[sig_col] = [[] for _ in range(len(df))]
-        else:
-            df[sig_col] = df[sig_col].apply(lambda v: v if isinstance(v, list) else ([] if pd.isna(v) else [str(v)]))
-
-    # Iterate rows
-    for idx, row in df.iterrows():
-        outlet = int(row.get("Orchestra_Pub_Tier", 0) or 0)
-        recency = int(pd.Timestamp(row.get("Date")).value) if pd.notna(row.get("Date")) else 0
-
-        # Peer cache for the row
-        row_peers = {}
-        for p in entities:
-            p_prom, p_sent, p_q, p_state, p_mod, p_sig = _entity_cols(p)
-            row_peers[p] = {
-                "prom": float(row.get(p_prom, 0.0) or 0.0),
-                "sent": float(row.get(p_sent, 0.0) or 0.0),
-                "mod": str(row.get(p_mod, "")) if p_mod in df.columns else "",
-            }
-        peer_max_prom = max([v["prom"] for v in row_peers.values()] + [0.0])
-        peer_max_sent = max([v["sent"] for v in row_peers.values()] + [0.0])
-
-        # Narrative context
-        row_narr_proms = {n: float(row.get(_narr_cols(n)[0], 0.0) or 0.0) for n in narratives}
-
-        for e in entities:
-            e_prom, e_sent, e_q, e_state, e_mod, e_sig = _entity_cols(e)
-            prom = float(row.get(e_prom, 0.0) or 0.0)
-            sent = float(row.get(e_sent, 0.0) or 0.0)
-            mod = str(row.get(e_mod, "")) if e_mod in df.columns else ""
-            # Presence gating: only evaluate entity-level signals when entity is present (>0)
-            entity_present = prom > 0.0
-            signals_meta: List[tuple] = []
-
-            # Narrative Shaping
-            if mod in ["Takedown", "Breakthrough"] or (prom >= 4.0 and outlet >= 4):
-                sev, stru = ENTITY_SIGNAL_WEIGHTS["Narrative Shaping"]
-                signals_meta.append(("Narrative Shaping", sev, stru, outlet, prom, recency))
-
-            # Wedge Potential: require entity present and same-article narrative present
-            if entity_present and narratives and any(v > 0 for v in row_narr_proms.values()):
-                for p, pv in row_peers.items():
-                    if p == e:
-                        continue
-                    if (sent - pv["sent"]) >= 1.5:
-                        sev, stru = ENTITY_SIGNAL_WEIGHTS["Wedge Potential"]
-                        signals_meta.append(("Wedge Potential", sev, stru, outlet, prom, recency))
-                        break
-
-            # Second Fiddle
-            if entity_present and prom < 3.0 and peer_max_prom >= 3.0:
-                sev, stru = ENTITY_SIGNAL_WEIGHTS["Second Fiddle"]
-                signals_meta.append(("Second Fiddle", sev, stru, outlet, prom, recency))
-
-            # Peer Pressure
-            if entity_present and peer_max_sent >= 2.5 and (0.0 <= sent <= 1.0):
-                sev, stru = ENTITY_SIGNAL_WEIGHTS["Peer Pressure"]
-                signals_meta.append(("Peer Pressure", sev, stru, outlet, prom, recency))
-
-            # Contrast / Polarized
-            for p, pv in row_peers.items():
-                if p == e:
-                    continue
-                if entity_present and abs(sent - pv["sent"]) >= 2.0:
-                    sev, stru = ENTITY_SIGNAL_WEIGHTS["Contrast Framing"]
-                    signals_meta.append(("Contrast Framing", sev, stru, outlet, prom, recency))
-                    break
-            for p, pv in row_peers.items():
-                if p == e:
-                    continue
-                if entity_present and (pv["sent"] - sent) >= 4.0:
-                    sev, stru = ENTITY_SIGNAL_WEIGHTS["Polarized Framing"]
-                    signals_meta.append(("Polarized Framing", sev, stru, outlet, prom, recency))
-                    break
-
-            # Ricochet Risk / Cautious Schadenfreude
-            if entity_present and any(pv["mod"] in ["Narrative Shaper", "Takedown", "Body Blow", "Stinger", "Collateral Damage"] for pv in row_peers.values()):
-                sev, stru = ENTITY_SIGNAL_WEIGHTS["Ricochet Risk"]
-                signals_meta.append(("Ricochet Risk", sev, stru, outlet, prom, recency))
-                if (prom == 0.0) or (sent >= 0.0):
-                    sev, stru = ENTITY_SIGNAL_WEIGHTS["Cautious Schadenfreude"]
-                    signals_meta.append(("Cautious Schadenfreude", sev, stru, outlet, prom, recency))
-
-            # Captured Narrative (article)
-            if entity_present and prom >= 2.5 and (peer_max_prom < 2.5):
-                sev, stru = ENTITY_SIGNAL_WEIGHTS["Captured Narrative (article)"]
-                signals_meta.append(("Captured Narrative (article)", sev, stru, outlet, prom, recency))
-
-            # Narrative Vacuum
-            if entity_present and narratives and all(v == 0.0 for v in row_narr_proms.values()):
-                sev, stru = ENTITY_SIGNAL_WEIGHTS["Narrative Vacuum"]
-                signals_meta.append(("Narrative Vacuum", sev, stru, outlet, prom, recency))
-
-            # Window-level signals (attach per row)
-            st = stats[e]
-            if st["had_HST_prev"] and (not np.isnan(st["avg_q_cur"])) and (not np.isnan(st["avg_q_prev"])) and ((st["avg_q_cur"] - st["avg_q_prev"]) <= -0.5):
-                sev, stru = ENTITY_SIGNAL_WEIGHTS["Strategic Fallout"]
-                signals_meta.append(("Strategic Fallout", sev, stru, outlet, prom, recency))
-            if st["had_Breakthrough_prev"] and (not np.isnan(st["avg_q_cur"])) and (not np.isnan(st["avg_q_prev"])) and ((st["avg_q_cur"] - st["avg_q_prev"]) >= 0.5):
-                sev, stru = ENTITY_SIGNAL_WEIGHTS["Strategic Uplift"]
-                signals_meta.append(("Strategic Uplift", sev, stru, outlet, prom, recency))
-
-            # Echo (tight)
-            if narratives:
-                narr_sorted = sorted([(nn, row.get(_narr_cols(nn)[0], 0.0)) for nn in narratives], key=lambda x: x[1], reverse=True)
-                if narr_sorted and float(narr_sorted[0][1] or 0.0) >= 2.0:
-                    top_n = narr_sorted[0][0]
-                    n_prom_col, n_sent_col = _narr_cols(top_n)
-                    cur_mask = (df["Date"] >= cur_win[0]) & (df["Date"] <= cur_win[1]) & (df[n_prom_col] >= 2.0)
-                    slice_cur = df.loc[cur_mask, ["Publication", n_sent_col, e_sent]]
-                    if len(slice_cur) >= 3:
-                        med_es = float(pd.to_numeric(slice_cur[e_sent], errors="coerce").dropna().median()) if not slice_cur.empty else np.nan
-                        med_ns = float(pd.to_numeric(slice_cur[n_sent_col], errors="coerce").dropna().median()) if not slice_cur.empty else np.nan
-                        tight = slice_cur[
-                            slice_cur[e_sent].between(med_es - 0.5, med_es + 0.5, inclusive="both")
-                            & slice_cur[n_sent_col].between(med_ns - 0.5, med_ns + 0.5, inclusive="both")
-                        ]
-                        if _count_distinct_publications(tight) >= 3:
-                            sev, stru = ENTITY_SIGNAL_WEIGHTS["Echo (tight)"]
-                            signals_meta.append(("Echo (tight)", sev, stru, outlet, prom, recency))
-
-            # Rising Threat / Rising Opportunity
-            if narratives:
-                narr_sorted = sorted([(nn, row.get(_narr_cols(nn)[0], 0.0)) for nn in narratives], key=lambda x: x[1], reverse=True)
-                if narr_sorted and float(narr_sorted[0][1] or 0.0) >= 2.0:
-                    top_n = narr_sorted[0][0]
-                    avg_es_cur = st["avg_sent_cur"]
-                    if narr_gain.get(top_n, False) and not np.isnan(avg_es_cur):
-                        if avg_es_cur < 0.0:
-                            sev, stru = ENTITY_SIGNAL_WEIGHTS["Rising Threat"]
-                            signals_meta.append(("Rising Threat", sev, stru, outlet, prom, recency))
-                        if avg_es_cur > 1.0:
-                            sev, stru = ENTITY_SIGNAL_WEIGHTS["Rising Opportunity"]
-                            signals_meta.append(("Rising Opportunity", sev, stru, outlet, prom, recency))
-
-            # Deepening/Strengthening/Lost Momentum/Prominence Spike/Momentum Gap
-            if (not np.isnan(st["avg_sent_cur"])) and (not np.isnan(st["avg_sent_prev"])):
-                if (st["avg_sent_prev"] - st["avg_sent_cur"]) >= 1.5:
-                    sev, stru = ENTITY_SIGNAL_WEIGHTS["Deepening Exposure"]
-                    signals_meta.append(("Deepening Exposure", sev, stru, outlet, prom, recency))
-                if (st["avg_sent_cur"] - st["avg_sent_prev"]) >= 1.5:
-                    sev, stru = ENTITY_SIGNAL_WEIGHTS["Strengthening Position"]
-                    signals_meta.append(("Strengthening Position", sev, stru, outlet, prom, recency))
-            if (not np.isnan(st["avg_prom_cur"])) and (not np.isnan(st["avg_prom_prev"])):
-                if (st["avg_prom_cur"] < st["avg_prom_prev"]) and (st["avg_sent_cur"] < st["avg_sent_prev"]):
-                    sev, stru = ENTITY_SIGNAL_WEIGHTS["Lost Momentum"]
-                    signals_meta.append(("Lost Momentum", sev, stru, outlet, prom, recency))
-                if (st["avg_prom_cur"] - st["avg_prom_prev"]) >= 2.0:
-                    sev, stru = ENTITY_SIGNAL_WEIGHTS["Prominence Spike"]
-                    signals_meta.append(("Prominence Spike", sev, stru, outlet, prom, recency))
-                peer_proms_cur, peer_proms_prev = [], []
-                for p in entities:
-                    if p == e:
-                        continue
-                    pst = stats[p]
-                    if not np.isnan(pst["avg_prom_cur"]):
-                        peer_proms_cur.append(pst["avg_prom_cur"])
-                    if not np.isnan(pst["avg_prom_prev"]):
-                        peer_proms_prev.append(pst["avg_prom_prev"])
-                if peer_proms_cur and peer_proms_prev:
-                    peer_avg_cur = float(np.mean(peer_proms_cur))
-                    peer_avg_prev = float(np.mean(peer_proms_prev))
-                    if (peer_avg_cur > st["avg_prom_cur"]) and ((peer_avg_cur - peer_avg_prev) >= 0.5) and ((st["avg_prom_cur"] - st["avg_prom_prev"]) <= 0):
-                        sev, stru = ENTITY_SIGNAL_WEIGHTS["Momentum Gap"]
-                        signals_meta.append(("Momentum Gap", sev, stru, outlet, prom, recency))
-
-            # Framing Cage (tight)
-            if narratives:
-                narr_sorted = sorted([(nn, row.get(_narr_cols(nn)[0], 0.0)) for nn in narratives], key=lambda x: x[1], reverse=True)
-                if narr_sorted and float(narr_sorted[0][1] or 0.0) > 0:
-                    top_n = narr_sorted[0][0]
-                    n_prom_col, _ = _narr_cols(top_n)
-                    c_mask = (df["Date"] >= cur_win[0]) & (df["Date"] <= cur_win[1]) & (df[n_prom_col] > 0)
-                    if c_mask.any():
-                        # Vectorized computation over the windowed slice
-                        peer_prom_cols = [_entity_cols(p)[0] for p in entities if p != e]
-                        cols_to_use = [e_prom] + peer_prom_cols
-                        sub = df.loc[c_mask, cols_to_use].copy()
-                        # Coerce to numeric to avoid mixed-type issues
-                        for c in cols_to_use:
-                            sub[c] = pd.to_numeric(sub[c], errors="coerce").fillna(0.0)
-                        peer_ge3_any = (sub[peer_prom_cols] >= 3.0).any(axis=1) if peer_prom_cols else pd.Series(False, index=sub.index)
-                        entity_lt3 = sub[e_prom] < 3.0
-                        entity_ge3 = sub[e_prom] >= 3.0
-                        if len(sub) > 0:
-                            share_case = float((peer_ge3_any & entity_lt3).mean())
-                            share_entity_ge3 = float((entity_ge3).mean())
-                            if (share_case >= 0.60) and (share_entity_ge3 <= 0.10):
-                                sev, stru = ENTITY_SIGNAL_WEIGHTS["Framing Cage (tight)"]
-                                signals_meta.append(("Framing Cage (tight)", sev, stru, outlet, prom, recency))
-
-            # Turbulent Frame (tight)
-            c_mask_e = (df["Date"] >= cur_win[0]) & (df["Date"] <= cur_win[1]) & df[e_prom].notna()
-            std_prom = _std_safe(df.loc[c_mask_e, e_prom])
-            std_sent = _std_safe(df.loc[c_mask_e, e_sent])
-            iqr_sent = _iqr_safe(df.loc[c_mask_e, e_sent])
-            if (std_prom >= 1.0) or (std_sent >= 1.5) or (iqr_sent >= 2.0):
-                sev, stru = ENTITY_SIGNAL_WEIGHTS["Turbulent Frame (tight)"]
-                signals_meta.append(("Turbulent Frame (tight)", sev, stru, outlet, prom, recency))
-
-            # Narrative Expansion / Fragmentation (window-level approximations)
-            if narratives:
-                pos_narrs = 0
-                prom_map = []
-                cm = (df["Date"] >= cur_win[0]) & (df["Date"] <= cur_win[1])
-                for nn in narratives:
-                    n_prom, n_sent = _narr_cols(nn)
-                    rows_nn = df.loc[cm & (df[n_prom] > 0)]
-                    if rows_nn.empty:
-                        continue
-                    e_prom_avg = _mean_safe(rows_nn[e_prom])
-                    e_sent_avg = _mean_safe(rows_nn[e_sent])
-                    prom_map.append((nn, e_prom_avg, e_sent_avg))
-                    if (e_prom_avg >= 2.5) and (e_sent_avg > 1.0):
-                        pos_narrs += 1
-                if pos_narrs >= 2:
-                    sev, stru = ENTITY_SIGNAL_WEIGHTS["Narrative Expansion"]
-                    signals_meta.append(("Narrative Expansion", sev, stru, outlet, prom, recency))
-                if len(prom_map) >= 2:
-                    sents = [x[2] for x in prom_map if not np.isnan(x[2])]
-                    if sents and (max(sents) - min(sents)) > 3.0 and any(x[1] >= 2.0 for x in prom_map):
-                        sev, stru = ENTITY_SIGNAL_WEIGHTS["Narrative Fragmentation"]
-                        signals_meta.append(("Narrative Fragmentation", sev, stru, outlet, prom, recency))
-
-            # Final cap per article per entity
-            ranked = _rank_and_cap_entity_signals(signals_meta)
-            if ranked:
-                cur_list = df.at[idx, e_sig] if isinstance(df.at[idx, e_sig], list) else []
-                df.at[idx, e_sig] = list(set(cur_list + ranked))
+    # Framing Cage (tight) per (narrative, entity): in the current window's articles carrying the
+    # narrative, peers hold >= 3.0 while the entity stays below it
+    framing_cage = np.zeros((len(narratives), len(entities)), dtype=bool)
+    for k in range(len(narratives)):
+        c_mask = cur_base & (narr_mat[:, k] > 0)
+        if c_mask.any():
+            sub = np.nan_to_num(prom_mat[c_mask], nan=0.0)  # missing scores count as 0
+            entity_ge3 = sub >= 3.0
+            peer_ge3_any = (entity_ge3.sum(axis=1, keepdims=True) - entity_ge3) > 0
+            share_case = (peer_ge3_any & ~entity_ge3).mean(axis=0)
+            framing_cage[k] = (share_case >= 0.60) & (entity_ge3.mean(axis=0) <= 0.10)
+
+    # Echo (tight) per (narrative, entity): at least 3 outlets within 0.5 of both the entity's and the
+    # narrative's median sentiment, over current-window articles where the narrative is >= 2.0
+    echo_tight = np.zeros((len(narratives), len(entities)), dtype=bool)
+    for k in range(len(narratives)):
+        n_mask = cur_base & (narr_mat[:, k] >= 2.0)
+        if n_mask.sum() < 3:
+            continue
+        n_sents = narr_sent_mat[n_mask, k]
+        med_ns = _median_safe(n_sents)
+        n_tight = (n_sents >= med_ns - 0.5) & (n_sents <= med_ns + 0.5)
+        pubs = pub_codes[n_mask]
+        for j in range(len(entities)):
+            e_sents = sent_mat[n_mask, j]
+            med_es = _median_safe(e_sents)
+            tight = n_tight & (e_sents >= med_es - 0.5) & (e_sents <= med_es + 0.5)
+            echo_tight[k, j] = _count_distinct(pubs[tight]) >= 3
+
+    # Turbulent Frame (tight): spread of each entity's scores over the current window
+    cur_rows = _window_rows(cur_base)
+    prom_win = prom_mat[cur_rows]
+    sent_win = np.where(np.isnan(prom_win), np.nan, sent_mat[cur_rows])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns; treated as no spread
+        std_prom = np.nan_to_num(np.nanstd(prom_win, axis=0, dtype=np.float64), nan=0.0)
+        std_sent = np.nan_to_num(np.nanstd(sent_win, axis=0), nan=0.0)
+        q3, q1 = np.nanpercentile(sent_win, [75, 25], axis=0) if len(sent_win) else np.full((2, len(entities)), np.nan)
+    iqr_sent = np.nan_to_num(q3 - q1, nan=0.0)
+    turbulent = (std_prom >= 1.0) | (std_sent >= 1.5) | (iqr_sent >= 2.0)
+
+    # Narrative Expansion / Fragmentation: each entity's average prominence and sentiment over the
+    # current-window articles carrying each narrative, one row gather per narrative
+    carried = []
+    for k in range(len(narratives)):
+        rows_nn = cur_base & (narr_mat[:, k] > 0)
+        if rows_nn.any():
+            carried.append(rows_nn)
+    carried_prom = np.full((len(carried), len(entities)), np.nan)
+    carried_sent = np.full((len(carried), len(entities)), np.nan)
+    for c, rows_nn in enumerate(carried):
+        sub_prom, sub_sent = prom_mat[rows_nn], sent_mat[rows_nn]
+        for j in range(len(entities)):
+            carried_prom[c, j] = _mean_safe(sub_prom[:, j])
+            carried_sent[c, j] = _mean_safe(sub_sent[:, j])
+    expansion = ((carried_prom >= 2.5) & (carried_sent > 1.0)).sum(axis=0) >= 2
+    if len(carried) >= 2:
+        sent_spread = np.fmax.reduce(carried_sent, axis=0) - np.fmin.reduce(carried_sent, axis=0)
+        fragmentation = (sent_spread > 3.0) & (carried_prom >= 2.0).any(axis=0)
+    else:
+        fragmentation = np.zeros(len(entities), dtype=bool)
+
+    # Window-level signals depend only on the entity; they are split into the groups emitted before
+    # Echo, between Rising and Framing Cage, and after it, since emission order breaks ranking ties
+    window_lead: List[List[tuple]] = []
+    window_mid: List[List[tuple]] = []
+    window_tail: List[List[tuple]] = []
+    avg_prom_cur = np.array([stats[e]["avg_prom_cur"] for e in entities], dtype=float)
+    avg_prom_prev = np.array([stats[e]["avg_prom_prev"] for e in entities], dtype=float)
+    for j, e in enumerate(entities):
+        st = stats[e]
+        lead, mid, tail = [], [], []
+        # Strategic Fallout / Strategic Uplift
+        if (not np.isnan(st["avg_q_cur"])) and (not np.isnan(st["avg_q_prev"])):
+            if st["had_HST_prev"] and ((st["avg_q_cur"] - st["avg_q_prev"]) <= -0.5):
+                lead.append("Strategic Fallout")
+            if st["had_Breakthrough_prev"] and ((st["avg_q_cur"] - st["avg_q_prev"]) >= 0.5):
+                lead.append("Strategic Uplift")
+
+        # Deepening/Strengthening/Lost Momentum/Prominence Spike/Momentum Gap
+        if (not np.isnan(st["avg_sent_cur"])) and (not np.isnan(st["avg_sent_prev"])):
+            if (st["avg_sent_prev"] - st["avg_sent_cur"]) >= 1.5:
+                mid.append("Deepening Exposure")
+            if (st["avg_sent_cur"] - st["avg_sent_prev"]) >= 1.5:
+                mid.append("Strengthening Position")
+        if (not np.isnan(st["avg_prom_cur"])) and (not np.isnan(st["avg_prom_prev"])):
+            if (st["avg_prom_cur"] < st["avg_prom_prev"]) and (st["avg_sent_cur"] < st["avg_sent_prev"]):
+                mid.append("Lost Momentum")
+            if (st["avg_prom_cur"] - st["avg_prom_prev"]) >= 2.0:
+                mid.append("Prominence Spike")
+            peer_proms_cur = np.delete(avg_prom_cur, j)
+            peer_proms_cur = peer_proms_cur[~np.isnan(peer_proms_cur)]
+            peer_proms_prev = np.delete(avg_prom_prev, j)
+            peer_proms_prev = peer_proms_prev[~np.isnan(peer_proms_prev)]
+            if peer_proms_cur.size and peer_proms_prev.size:
+                peer_avg_cur = float(peer_proms_cur.mean())
+                peer_avg_prev = float(peer_proms_prev.mean())
+                if (peer_avg_cur > st["avg_prom_cur"]) and ((peer_avg_cur - peer_avg_prev) >= 0.5) and ((st["avg_prom_cur"] - st["avg_prom_prev"]) <= 0):
+                    mid.append("Momentum Gap")
+
+        # Turbulent Frame (tight)
+        if turbulent[j]:
+            tail.append("Turbulent Frame (tight)")
+
+        # Narrative Expansion / Fragmentation (window-level approximations)
+        if expansion[j]:
+            tail.append("Narrative Expansion")
+        if fragmentation[j]:
+            tail.append("Narrative Fragmentation")
+
+        window_lead.append([(name, *ENTITY_SIGNAL_WEIGHTS[name]) for name in lead])
+        window_mid.append([(name, *ENTITY_SIGNAL_WEIGHTS[name]) for name in mid])
+        window_tail.append([(name, *ENTITY_SIGNAL_WEIGHTS[name]) for name in tail])
+
+    # The remaining per-article signals depend only on the entity and the article's top narrative;
+    # resolve them once per (narrative, entity) pair
+    top_narr_lead: List[List[List[tuple]]] = []
+    for k, n in enumerate(narratives):
+        per_entity = []
+        for j, e in enumerate(entities):
+            names = []
+            if echo_tight[k, j]:
+                names.append("Echo (tight)")
+            avg_es_cur = stats[e]["avg_sent_cur"]
+            if narr_gain.get(n, False) and not np.isnan(avg_es_cur):
+                if avg_es_cur < 0.0:
+                    names.append("Rising Threat")
+                if avg_es_cur > 1.0:
+                    names.append("Rising Opportunity")
+            per_entity.append([(name, *ENTITY_SIGNAL_WEIGHTS[name]) for name in names])
+        top_narr_lead.append(per_entity)
+
+    # Signal lists per entity (by position), filled in place and written back once at the end
+    ent_signals = [_signal_lists(df, ent_cols[e][5]) for e in entities]
+
+    # Article-level rules, evaluated for every (row, entity) pair at once
+    if entities:
+        present = prom_mat > 0.0
+        # max() over a row's values keeps a leading NaN, so a NaN for the first entity voids the peer maximum
+        peer_max_prom = np.where(np.isnan(prom_mat[:, 0]), np.nan, np.fmax(np.fmax.reduce(prom_mat, axis=1), 0.0))[:, None]
+        peer_max_sent = np.where(np.isnan(sent_mat[:, 0]), np.nan, np.fmax(np.fmax.reduce(sent_mat, axis=1), 0.0))[:, None]
+        # Row-wide lowest/highest sentiment (NaN ignored). The rules below only ask whether some peer sits
+        # a positive margin away, which the entity's own value can never satisfy, so the row extremes
+        # stand in for the peers-only ones
+        row_min_sent = np.fmin.reduce(sent_mat, axis=1)[:, None]
+        row_max_sent = np.fmax.reduce(sent_mat, axis=1)[:, None]
+        narr_any = (narr_mat > 0).any(axis=1)[:, None] if narratives else np.zeros((n_rows, 1), dtype=bool)
+        narr_none = (narr_mat == 0.0).all(axis=1)[:, None] if narratives else np.zeros((n_rows, 1), dtype=bool)
+        # OR-ing each row's flags answers "does any entity here carry a peer-shaping modifier" in one pass
+        peer_shaper = (np.bitwise_or.reduce(mod_bits, axis=1) & MOD_PEER_SHAPER).astype(bool)[:, None]
+        ricochet = present & peer_shaper
+        # Listed in the order the rules are emitted, which breaks ties in the ranking
+        article_rules = [
+            ("Narrative Shaping", (mod_bits & MOD_SHAPING).astype(bool) | ((prom_mat >= 4.0) & (outlet_arr[:, None] >= 4))),
+            ("Wedge Potential", present & narr_any & ((sent_mat - row_min_sent) >= 1.5)),
+            ("Second Fiddle", present & (prom_mat < 3.0) & (peer_max_prom >= 3.0)),
+            ("Peer Pressure", present & (peer_max_sent >= 2.5) & (sent_mat >= 0.0) & (sent_mat <= 1.0)),
+            ("Contrast Framing", present & (((sent_mat - row_min_sent) >= 2.0) | ((row_max_sent - sent_mat) >= 2.0))),
+            ("Polarized Framing", present & ((row_max_sent - sent_mat) >= 4.0)),
+            ("Ricochet Risk", ricochet),
+            ("Cautious Schadenfreude", ricochet & ((prom_mat == 0.0) | (sent_mat >= 0.0))),
+            ("Captured Narrative (article)", present & (prom_mat >= 2.5) & (peer_max_prom < 2.5)),
+            ("Narrative Vacuum", present & narr_none),
+        ]
+        # One nonzero() over (row, entity, rule) yields every emission in row/entity/rule order
+        fired = np.stack([mask for _, mask in article_rules], axis=-1)
+        cell_rules: List[List[List[int]]] = [[[] for _ in entities] for _ in range(n_rows)]
+        for i, j, k in zip(*np.nonzero(fired)):
+            cell_rules[i][j].append(k)
+        rule_meta = [(name, *ENTITY_SIGNAL_WEIGHTS[name]) for name, _ in article_rules]
+
+    # Each article's top narrative: the first of its highest scores, as a stable descending sort picks.
+    # Rows holding a NaN score go through sorted() itself, whose pick NaN comparisons make order-dependent
+    if narratives:
+        top_narr = narr_mat.argmax(axis=1)
+        for i in np.flatnonzero(np.isnan(narr_mat).any(axis=1)):
+            top_narr[i] = sorted(enumerate(narr_mat[i]), key=lambda x: x[1], reverse=True)[0][0]
+        top_score = narr_mat[np.arange(n_rows), top_narr]
+
+    # Only cells with at least one candidate signal need ranking; the rest keep their existing lists
+    if entities:
+        window_any = np.array([bool(window_lead[j] or window_mid[j] or window_tail[j]) for j in range(len(entities))])
+        candidates = fired.any(axis=-1) | window_any[None, :]
+        if narratives:
+            lead_any = np.array([[bool(meta) for meta in per_entity] for per_entity in top_narr_lead], dtype=bool)
+            candidates |= (top_score >= 2.0)[:, None] & lead_any[top_narr]
+            candidates |= (top_score > 0)[:, None] & framing_cage[top_narr]
+    else:
+        candidates = np.zeros((n_rows, 0), dtype=bool)
+
+    for i, j in zip(*np.nonzero(candidates)):
+        signals_meta: List[tuple] = [rule_meta[k] for k in cell_rules[i][j]]
+        # Window-level signals (attach per row)
+        signals_meta += window_lead[j]
+
+        if narratives:
+            top_k, top_val = top_narr[i], top_score[i]
+            # Echo (tight) / Rising Threat / Rising Opportunity
+            if top_val >= 2.0:
+                signals_meta += top_narr_lead[top_k][j]
+
+        # Deepening/Strengthening/Lost Momentum/Prominence Spike/Momentum Gap
+        signals_meta += window_mid[j]
+
+        # Framing Cage (tight)
+        if narratives and top_val > 0 and framing_cage[top_k, j]:
+            signals_meta.append(("Framing Cage (tight)", *ENTITY_SIGNAL_WEIGHTS["Framing Cage (tight)"]))
+
+        # Turbulent Frame / Narrative Expansion / Fragmentation
+        signals_meta += window_tail[j]
+
+        # Final cap per article per entity
+        ranked = _rank_and_cap_entity_signals(signals_meta)
+        row_signals = ent_signals[j]
+        # Existing signals first, then this pass's in rank order, so output is reproducible
+        row_signals[i] = list(dict.fromkeys(row_signals[i] + ranked))
+    for e, signals in zip(entities, ent_signals):
+        df[ent_cols[e][5]] = signals
     return df
 
 
@@ -625,31 +773,42 @@ def compute_entity_signals(df: pd.DataFrame) -> pd.DataFrame:
 # Orchestrator and entry point
 # ------------------------------
 def apply_all_signals(df: pd.DataFrame, as_of: str | None = None) -> pd.DataFrame:
-    df = df.copy()
+    # Shallow copy: every pass assigns whole columns, which never writes into the caller's arrays,
+    # so the (large) text columns are shared rather than duplicated
+    df = df.copy(deep=False)
     df = _normalize_headers(df)
     df = _ensure_datetime(df, "Date")
+    # Window masks and score matrices are shared by all three passes
+    windows = _window_masks(df)
+    mats = _score_matrices(df)
     # Topic
-    df = compute_topic_signals(df)
+    df = compute_topic_signals(df, windows, mats)
     # Narrative
-    df = compute_narrative_signals(df)
+    df = compute_narrative_signals(df, windows, mats)
     # Entity
-    df = compute_entity_signals(df)
+    df = compute_entity_signals(df, windows, mats)
     # Normalize list columns to pipe-joined strings for CSV
     list_cols = [c for c in df.columns if c.endswith("signals") or c == "O_signals"]
     for c in list_cols:
-        df[c] = df[c].apply(lambda v: ", ".join(v) if isinstance(v, list) else (v if isinstance(v, str) else ""))
+        values = df[c].to_numpy(dtype=object)
+        df[c] = np.fromiter(
+            (", ".join(v) if isinstance(v, list) else (v if isinstance(v, str) else "") for v in values),
+            dtype=object,
+            count=len(values),
+        )
     return df
 
 
 def process_signals(csv_path: str, as_of: str | None = None) -> str:
     df = pd.read_csv(csv_path, low_memory=False)
     out_df = apply_all_signals(df, as_of=as_of)
-    if "/" in csv_path:
-        dirname, filename = csv_path.rsplit("/", 1)
-    else:
-        dirname, filename = ".", csv_path
-    out_path = f"{dirname}/Signals_{filename}"
+    out_path = signals_output_path(csv_path)
     out_df.to_csv(out_path, index=False)
     return out_path
 
 
+def signals_output_path(csv_path: str) -> str:
+    """Path that process_signals() writes the Pass 2 output for ``csv_path`` to."""
+    return os.path.join(os.path.dirname(csv_path) or ".", f"Signals_{os.path.basename(csv_path)}")
+
+
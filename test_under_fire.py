@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
 
+from debug_under_fire import TAKEDOWN_CASES
+import vertical_analysis
+
+
 def assign_under_fire_modifier(prom: float, sent: float, outlet: float) -> str:
     """
     Canonical Under Fire modifier logic per Ben's v4 audit feedback.
@@ -33,6 +37,14 @@ def assign_under_fire_modifier(prom: float, sent: float, outlet: float) -> str:
     else:
         return ""  # Should never happen now
 
+
+def test_under_fire_takedown():
+    # Pipeline implementation and the canonical reference above must agree
+    for prom, sent, outlet, expected in TAKEDOWN_CASES:
+        assert vertical_analysis.assign_under_fire_modifier(prom, sent, outlet) == expected, (prom, sent, outlet)
+        assert assign_under_fire_modifier(prom, sent, outlet) == expected, (prom, sent, outlet)
+
+
 if __name__ == "__main__":
     # Test the 16 blank cases - should now return values
     print('Testing canonical gap bridge:')
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import glob
+import io
+import os
+import tempfile
+
+import app
+
+
+def test_truncated_multipart_leaves_no_upload_dir():
+    # A body cut off mid-part never completes the form, so the file part's sink is
+    # not in request.files; the request must still remove its working directory
+    boundary = "orchestra-test-boundary"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="input.csv"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+        "Outlet,Headline,Sentiment\r\n" + "Example,Some headline,-2.5\r\n" * 200
+    ).encode()
+    work_root = app.WORK_ROOT
+    with tempfile.TemporaryDirectory() as tmp:
+        app.WORK_ROOT = tmp
+        try:
+            client = app.app.test_client()
+            client.post(
+                "/upload",
+                data=body,
+                content_type=f"multipart/form-data; boundary={boundary}",
+            )
+            assert glob.glob(os.path.join(tmp, "upload-*")) == []
+        finally:
+            app.WORK_ROOT = work_root
+
+
+def test_short_octet_stream_body_is_rejected():
+    # Under gunicorn a body shorter than its Content-Length reads as a clean EOF
+    body = b"Outlet,Headline,Sentiment\r\n" + b"Example,Some headline,-2.5\r\n" * 200
+    work_root = app.WORK_ROOT
+    with tempfile.TemporaryDirectory() as tmp:
+        app.WORK_ROOT = tmp
+        try:
+            client = app.app.test_client()
+            response = client.post(
+                "/upload",
+                input_stream=io.BytesIO(body[: len(body) // 2]),
+                content_type="application/octet-stream",
+                headers={"X-Filename": "input.csv"},
+                environ_overrides={"CONTENT_LENGTH": str(len(body)), "wsgi.input_terminated": True},
+            )
+            assert response.status_code == 400
+            assert glob.glob(os.path.join(tmp, "upload-*")) == []
+        finally:
+            app.WORK_ROOT = work_root
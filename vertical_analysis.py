@@ -2,6 +2,7 @@ import argparse
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 
@@ -185,16 +186,19 @@ def discover_coded_entities_and_narratives(columns: List[str]) -> Tuple[Dict[int
     return entity_mappings, narrative_mappings, narrative_precedence, debug_info
 
 
-def initialize_mappings_from_csv(csv_path: str) -> str:
+def initialize_mappings_from_csv(csv_path: str, columns: Optional[List[str]] = None) -> str:
     """Initialize dynamic mappings from CSV headers with detailed preview
     
+    Pass ``columns`` when the CSV has already been parsed to skip re-reading its header.
+    
     Returns: HTML-formatted preview text for web display
     """
     global ENTITY_MAPPINGS, NARRATIVE_MAPPINGS, NARRATIVE_TIE_PRECEDENCE, LAST_MAPPING_PREVIEW
     
     # Read just the header to get column names
-    df_header = pd.read_csv(csv_path, nrows=0)
-    columns = df_header.columns.tolist()
+    if columns is None:
+        df_header = pd.read_csv(csv_path, nrows=0)
+        columns = df_header.columns.tolist()
     
     # Auto-detect and populate global mappings
     ENTITY_MAPPINGS, NARRATIVE_MAPPINGS, NARRATIVE_TIE_PRECEDENCE, debug_info = discover_coded_entities_and_narratives(columns)
@@ -287,18 +291,24 @@ def coerce_float(value) -> float:
         return 0.0
 
 
+def coerce_float_series(values: pd.Series) -> np.ndarray:
+    # Column-wide coerce_float: unparseable and missing cells read as 0.0
+    return pd.to_numeric(values, errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+
+
 def is_present(prominence_value: float) -> bool:
     return prominence_value > 0.0
 
 
+def normalize_sentiment_weak_collapse_vec(raw_sentiment) -> np.ndarray:
+    # Weak sentiment collapses to ±1.0 (zero, including -0.0, reads as 0.0); other values pass through
+    raw = np.asarray(raw_sentiment, dtype=float)
+    conditions = [raw == 0.0, (0.01 <= raw) & (raw <= 1.0), (-1.0 <= raw) & (raw <= -0.01)]
+    return np.select(conditions, [0.0, 1.0, -1.0], default=raw)
+
+
 def normalize_sentiment_weak_collapse(raw_sentiment: float) -> float:
-    if raw_sentiment == 0.0:
-        return 0.0
-    if 0.01 <= raw_sentiment <= 1.0:
-        return 1.0
-    if -1.0 <= raw_sentiment <= -0.01:
-        return -1.0
-    return raw_sentiment
+    return float(normalize_sentiment_weak_collapse_vec(raw_sentiment))
 
 
 def gated_sentiment(prominence: float, sentiment: float) -> float:
@@ -306,215 +316,350 @@ def gated_sentiment(prominence: float, sentiment: float) -> float:
     return sentiment if prominence > 0.0 else 0.0
 
 
+def central_narrative_indexes(prom_block: np.ndarray, sent_block: np.ndarray) -> np.ndarray:
+    """
+    Column of the central narrative per row of (rows, narratives) blocks in NARRATIVE_TIE_PRECEDENCE order.
+    Highest prominence wins; ties go to higher absolute sentiment, then to precedence order.
+    Like the old running scan seeded with (-1.0, 0.0), a row whose best pair does not beat it gets -1.
+    """
+    n_rows, n_narr = prom_block.shape
+    if n_narr == 0:
+        return np.full(n_rows, -1, dtype=np.intp)
+    abs_sent = np.abs(sent_block)
+    best_prom = prom_block.max(axis=1)
+    at_best = prom_block == best_prom[:, None]
+    best_abs = np.where(at_best, abs_sent, -np.inf).max(axis=1)
+    idx = (at_best & (abs_sent == best_abs[:, None])).argmax(axis=1)
+    beats_seed = (best_prom > -1.0) | ((best_prom == -1.0) & (best_abs > 0.0))
+    return np.where(beats_seed, idx, -1)
+
+
 def pick_central_narrative(row: pd.Series) -> Tuple[str, float, float]:
     # Returns (narrative_key, prominence, sentiment)
-    best_key = ""
-    best_prom = -1.0
-    best_sent_for_ties = 0.0
-
-    for key in NARRATIVE_TIE_PRECEDENCE:
-        mapping = NARRATIVE_MAPPINGS[key]
-        prom = coerce_float(row.get(mapping.prominence, 0.0))
-        sent = coerce_float(row.get(mapping.sentiment, 0.0))
-        if prom > best_prom:
-            best_key = key
-            best_prom = prom
-            best_sent_for_ties = abs(sent)
-        elif prom == best_prom:
-            # tie-break by higher absolute sentiment, then precedence order is already maintained by loop order
-            if abs(sent) > best_sent_for_ties:
-                best_key = key
-                best_prom = prom
-                best_sent_for_ties = abs(sent)
-
-    if best_key == "":
+    proms = [coerce_float(row.get(NARRATIVE_MAPPINGS[key].prominence, 0.0)) for key in NARRATIVE_TIE_PRECEDENCE]
+    sents = [coerce_float(row.get(NARRATIVE_MAPPINGS[key].sentiment, 0.0)) for key in NARRATIVE_TIE_PRECEDENCE]
+    idx = int(central_narrative_indexes(np.array([proms], dtype=float), np.array([sents], dtype=float))[0])
+    if idx < 0:
         return ("", 0.0, 0.0)
-
-    best_mapping = NARRATIVE_MAPPINGS[best_key]
-    return (
-        best_key,
-        coerce_float(row.get(best_mapping.prominence, 0.0)),
-        coerce_float(row.get(best_mapping.sentiment, 0.0)),
-    )
+    return (NARRATIVE_TIE_PRECEDENCE[idx], proms[idx], sents[idx])
 
 
 # -------------------------------
 # State assignment logic
 # -------------------------------
 
+TOPIC_STATES = ("Absent", "High Risk", "Risky", "Healthy", "Ambient Risk", "Niche")
+NARRATIVE_STATES = ("Absent", "High Risk", "Risky", "Healthy", "Ambient Risk", "Peripheral")
+# Label per _presence_state_codes() code; code -1 (no rule) picks the trailing "Undetermined"
+_TOPIC_STATE_LABELS = np.array(TOPIC_STATES + ("Undetermined",), dtype=object)
+_NARRATIVE_STATE_LABELS = np.array(NARRATIVE_STATES + ("Undetermined",), dtype=object)
+
+
+def _presence_state_codes(present, prom, sent) -> np.ndarray:
+    """
+    Shared topic/narrative state rules over whole arrays.
+    Returns int8 indexes into TOPIC_STATES / NARRATIVE_STATES, -1 for Undetermined (e.g. NaN sentiment).
+    Precedence: Absent, High Risk, Risky, Healthy, Ambient Risk, Niche/Peripheral
+    """
+    present = np.asarray(present, dtype=bool)
+    prom = np.asarray(prom, dtype=float)
+    sent = np.asarray(sent, dtype=float)
+    central = prom >= 2.5
+    conditions = [
+        ~present,
+        central & (sent < -2.0),
+        central & (0.0 > sent) & (sent >= -2.0),
+        central & (sent >= 0.0),
+        (prom < 2.5) & (sent < 0.0),
+        (prom < 2.5) & (sent >= 0.0),
+    ]
+    return np.select(conditions, np.arange(len(conditions), dtype=np.int8), default=np.int8(-1))
+
+
+def assign_topic_state_vec(topic_present, topic_prom, topic_sent) -> np.ndarray:
+    # Object array of topic state labels
+    return _TOPIC_STATE_LABELS[_presence_state_codes(topic_present, topic_prom, topic_sent)]
+
+
+def assign_narrative_state_vec(narr_present, narr_prom, narr_sent) -> np.ndarray:
+    # Object array of narrative state labels
+    return _NARRATIVE_STATE_LABELS[_presence_state_codes(narr_present, narr_prom, narr_sent)]
+
+
 def assign_topic_state(topic_present: bool, topic_prom: float, topic_sent: float) -> str:
-    if not topic_present:
-        return "Absent"
-    # Precedence: High Risk, Risky, Healthy, Ambient Risk, Niche
-    if topic_prom >= 2.5 and topic_sent < -2.0:
-        return "High Risk"
-    if topic_prom >= 2.5 and 0.0 > topic_sent >= -2.0:
-        return "Risky"
-    # Healthy: central and non-negative
-    if topic_prom >= 2.5 and topic_sent >= 0.0:
-        return "Healthy"
-    if topic_prom < 2.5 and topic_sent < 0.0:
-        return "Ambient Risk"
-    if topic_prom < 2.5 and topic_sent >= 0.0:
-        return "Niche"
-    return "Undetermined"
+    return str(assign_topic_state_vec(topic_present, topic_prom, topic_sent))
 
 
 def assign_narrative_state(narr_present: bool, narr_prom: float, narr_sent: float) -> str:
-    if not narr_present:
-        return "Absent"
-    # Precedence: High Risk, Risky, Healthy, Ambient Risk, Peripheral
-    if narr_prom >= 2.5 and narr_sent < -2.0:
-        return "High Risk"
-    if narr_prom >= 2.5 and 0.0 > narr_sent >= -2.0:
-        return "Risky"
-    if narr_prom >= 2.5 and narr_sent >= 0.0:
-        return "Healthy"
-    if narr_prom < 2.5 and narr_sent < 0.0:
-        return "Ambient Risk"
-    if narr_prom < 2.5 and narr_sent >= 0.0:
-        return "Peripheral"
-    return "Undetermined"
+    return str(assign_narrative_state_vec(narr_present, narr_prom, narr_sent))
 
 
-def assign_entity_state(entity_prom: float, entity_sent: float, topic_prom: float, tracked_narr_proms: list) -> str:
+ENTITY_STATES = ("Off-Stage", "Absent", "Under Fire", "Leader", "Supporting Player")
+# Label per entity_state_codes() code; code -1 (out-of-scope / data gap) picks the trailing "Undetermined"
+_ENTITY_STATE_LABELS = np.array(ENTITY_STATES + ("Undetermined",), dtype=object)
+
+
+def entity_state_codes(entity_prom, entity_sent, topic_prom, max_narr_prom) -> np.ndarray:
     """
-    Canonical state assignment per Ben's latest audit feedback.
+    Canonical state assignment per Ben's latest audit feedback, over whole arrays.
+    Returns int8 indexes into ENTITY_STATES, -1 for Undetermined.
     Uses max narrative prominence for narrative presence detection.
     """
-    import pandas as pd
-    
+    entity_prom = np.asarray(entity_prom, dtype=float)
+    entity_sent = np.asarray(entity_sent, dtype=float)
+    topic_prom = np.asarray(topic_prom, dtype=float)
+    max_narr_prom = np.asarray(max_narr_prom, dtype=float)
+    # Ben's exact canonical state assignment logic
+    # Off-Stage requires topic present AND max narrative prominence > 0
+    # Absent requires topic present AND max narrative prominence = 0
+    off_stage_or_absent = (topic_prom > 0) & (entity_prom == 0)
+    conditions = [
+        off_stage_or_absent & (max_narr_prom > 0),
+        off_stage_or_absent,
+        (entity_prom > 0) & (entity_sent < 0),
+        (entity_prom >= 3) & (entity_sent > 0),
+        (0 < entity_prom) & (entity_prom < 3) & (entity_sent > 0),
+    ]
+    return np.select(conditions, np.arange(len(ENTITY_STATES), dtype=np.int8), default=np.int8(-1))
+
+
+def assign_entity_state_vec(entity_prom, entity_sent, topic_prom, max_narr_prom) -> np.ndarray:
+    # Object array of entity state labels
+    return _ENTITY_STATE_LABELS[entity_state_codes(entity_prom, entity_sent, topic_prom, max_narr_prom)]
+
+
+def assign_entity_state(entity_prom: float, entity_sent: float, topic_prom: float, tracked_narr_proms: list) -> str:
     # Handle NaN/null entity prominence and sentiment
     if pd.isna(entity_prom):
         entity_prom = 0.0
     if pd.isna(entity_sent):
         entity_sent = 0.0
-    
     # Ben's canonical narrative presence detection: use max narrative prominence
     max_narr_prom = max([prom for prom in tracked_narr_proms if not pd.isna(prom)], default=0.0)
-    
-    # Ben's exact canonical state assignment logic
-    if topic_prom > 0 and entity_prom == 0:
-        # Off-Stage requires topic present AND max narrative prominence > 0
-        # Absent requires topic present AND max narrative prominence = 0
-        return "Off-Stage" if max_narr_prom > 0 else "Absent"
-    elif entity_prom > 0 and entity_sent < 0:
-        return "Under Fire"
-    elif entity_prom >= 3 and entity_sent > 0:
-        return "Leader"
-    elif 0 < entity_prom < 3 and entity_sent > 0:
-        return "Supporting Player"
-    else:
-        return "Undetermined"  # out-of-scope / data gap
+    return str(assign_entity_state_vec(entity_prom, entity_sent, topic_prom, max_narr_prom))
+
+
+def missing_state_mask(states: pd.Series) -> np.ndarray:
+    # Input states to fill in: missing, empty, or the "nan" a str() round trip leaves behind
+    return (states.isna() | (states == "") | (states == "nan")).to_numpy()
 
 
 # -------------------------------
 # Modifier assignment logic (entity)
 # -------------------------------
 
-def assign_absent_modifier(topic_prom: float, topic_sent: float) -> str:
+ABSENT_MODIFIERS = ("Not Relevant", "Narrative Drift", "Framing Risk")
+_ABSENT_LABELS = np.array(ABSENT_MODIFIERS, dtype=object)
+
+
+def absent_modifier_codes(topic_prom, topic_sent) -> np.ndarray:
     """
-    Canonical Absent modifier logic per Ben's audit feedback.
+    Canonical Absent modifier logic per Ben's audit feedback, over whole arrays.
     Uses topic prominence and sentiment only, with no tracked narratives present.
+    Returns int8 indexes into ABSENT_MODIFIERS; every row gets one.
     """
-    # Canonical Absent modifier rules (deterministic, short-circuit)
-    if topic_prom < 2:
-        return "Not Relevant"
-    elif topic_sent >= 0:
-        return "Narrative Drift"
-    else:
-        return "Framing Risk"
+    topic_prom = np.asarray(topic_prom, dtype=float)
+    topic_sent = np.asarray(topic_sent, dtype=float)
+    # Canonical Absent modifier rules (deterministic, short-circuit); anything else is Framing Risk
+    conditions = [topic_prom < 2, topic_sent >= 0]
+    return np.select(conditions, np.arange(len(conditions), dtype=np.int8), default=np.int8(2))
 
 
-def assign_off_stage_modifier(dominant_narr_prom: float, dominant_narr_sent: float, peer_count_prom_ge_2: int) -> str:
+def assign_absent_modifier_vec(topic_prom, topic_sent) -> np.ndarray:
+    return _ABSENT_LABELS[absent_modifier_codes(topic_prom, topic_sent)]
+
+
+def assign_absent_modifier(topic_prom: float, topic_sent: float) -> str:
+    return str(assign_absent_modifier_vec(topic_prom, topic_sent))
+
+
+OFF_STAGE_MODIFIERS = (
+    "Competitor-Led",
+    "Missed Opportunity",
+    "Guilt by Association",
+    "Innocent Bystander",
+    "Reporter-Led Risk",
+    "Overlooked",
+)
+# Label per off_stage_modifier_codes() code; code -1 picks the trailing ""
+_OFF_STAGE_LABELS = np.array(OFF_STAGE_MODIFIERS + ("",), dtype=object)
+
+
+def off_stage_modifier_codes(dominant_narr_prom, dominant_narr_sent, peer_count_prom_ge_2) -> np.ndarray:
     """
-    Canonical Off-Stage modifier logic per Ben's v4 audit feedback.
+    Canonical Off-Stage modifier logic per Ben's v4 audit feedback, over whole arrays.
     Uses:
     - peer_count_prom_ge_2: Count of OTHER tracked entities with Prom >= 2.0 in same article
     - dominant_narr_prom/sent: The tracked narrative with highest prominence in article
-    
+
     Implements exactly the 6 canonical conditions with proper peer counting.
+    Returns int8 indexes into OFF_STAGE_MODIFIERS, -1 if none holds (should never happen with canonical rules).
     """
+    dom_prom = np.asarray(dominant_narr_prom, dtype=float)
+    dom_sent = np.asarray(dominant_narr_sent, dtype=float)
+    peers = np.asarray(peer_count_prom_ge_2)
     # Canonical Off-Stage modifiers (deterministic, exact precedence)
-    if dominant_narr_sent >= 0.0 and peer_count_prom_ge_2 >= 1:
-        return "Competitor-Led"
-    elif dominant_narr_sent >= 0.0 and dominant_narr_prom >= 2.5 and peer_count_prom_ge_2 == 0:
-        return "Missed Opportunity"
-    elif dominant_narr_sent < 0.0 and peer_count_prom_ge_2 >= 2:
-        return "Guilt by Association"
-    elif dominant_narr_sent < 0.0 and peer_count_prom_ge_2 == 1:
-        return "Innocent Bystander"
-    elif dominant_narr_sent < 0.0 and dominant_narr_prom >= 2.5 and peer_count_prom_ge_2 == 0:
-        return "Reporter-Led Risk"
-    elif dominant_narr_prom < 2.5 and peer_count_prom_ge_2 == 0:
-        return "Overlooked"
-    else:
-        # Should never happen with canonical rules
-        return ""
+    conditions = [
+        (dom_sent >= 0.0) & (peers >= 1),
+        (dom_sent >= 0.0) & (dom_prom >= 2.5) & (peers == 0),
+        (dom_sent < 0.0) & (peers >= 2),
+        (dom_sent < 0.0) & (peers == 1),
+        (dom_sent < 0.0) & (dom_prom >= 2.5) & (peers == 0),
+        (dom_prom < 2.5) & (peers == 0),
+    ]
+    return np.select(conditions, np.arange(len(OFF_STAGE_MODIFIERS), dtype=np.int8), default=np.int8(-1))
 
 
-def assign_supporting_player_modifier(outlet: float, sent: float) -> str:
+def assign_off_stage_modifier_vec(dominant_narr_prom, dominant_narr_sent, peer_count_prom_ge_2) -> np.ndarray:
+    return _OFF_STAGE_LABELS[off_stage_modifier_codes(dominant_narr_prom, dominant_narr_sent, peer_count_prom_ge_2)]
+
+
+def assign_off_stage_modifier(dominant_narr_prom: float, dominant_narr_sent: float, peer_count_prom_ge_2: int) -> str:
+    return str(assign_off_stage_modifier_vec(dominant_narr_prom, dominant_narr_sent, peer_count_prom_ge_2))
+
+
+SUPPORTING_PLAYER_MODIFIERS = ("Strategic Signal", "Low-Heat Visibility", "Check the Box", "Background Noise")
+# Label per supporting_player_modifier_codes() code; code -1 picks the trailing ""
+_SUPPORTING_PLAYER_LABELS = np.array(SUPPORTING_PLAYER_MODIFIERS + ("",), dtype=object)
+
+
+def supporting_player_modifier_codes(outlet, sent) -> np.ndarray:
     """
-    Canonical Supporting Player modifier logic per Ben's audit feedback.
+    Canonical Supporting Player modifier logic per Ben's audit feedback, over whole arrays.
+    Returns int8 indexes into SUPPORTING_PLAYER_MODIFIERS, -1 where no rule applies.
     """
+    outlet = np.asarray(outlet, dtype=float)
+    sent = np.asarray(sent, dtype=float)
+    strong = sent >= 3
+    mild = (0.5 <= sent) & (sent < 3)
     # Canonical Supporting Player modifiers
-    if outlet >= 3 and sent >= 3:
-        return "Strategic Signal"
-    elif outlet >= 3 and 0.5 <= sent < 3:
-        return "Low-Heat Visibility"
-    elif outlet < 3 and sent >= 3:
-        return "Check the Box"
-    elif outlet < 3 and 0.5 <= sent < 3:
-        return "Background Noise"
-    else:
-        return ""
+    conditions = [(outlet >= 3) & strong, (outlet >= 3) & mild, (outlet < 3) & strong, (outlet < 3) & mild]
+    return np.select(conditions, np.arange(len(SUPPORTING_PLAYER_MODIFIERS), dtype=np.int8), default=np.int8(-1))
 
 
-def assign_under_fire_modifier(prom: float, sent: float, outlet: float) -> str:
+def assign_supporting_player_modifier_vec(outlet, sent) -> np.ndarray:
+    return _SUPPORTING_PLAYER_LABELS[supporting_player_modifier_codes(outlet, sent)]
+
+
+def assign_supporting_player_modifier(outlet: float, sent: float) -> str:
+    return str(assign_supporting_player_modifier_vec(outlet, sent))
+
+
+UNDER_FIRE_MODIFIERS = (
+    "Narrative Shaper",
+    "Takedown",
+    "Body Blow",
+    "Stinger",
+    "Light Jab",
+    "Collateral Damage",
+    "Peripheral Hit",
+)
+# Label per under_fire_modifier_codes() code; code -1 (no rule) picks the trailing ""
+_UNDER_FIRE_LABELS = np.array(UNDER_FIRE_MODIFIERS + ("",), dtype=object)
+
+
+def under_fire_modifier_codes(prom, sent, outlet) -> np.ndarray:
     """
-    Canonical Under Fire modifier logic per Ben's v4 audit feedback.
-    Uses exact outlet boundaries and strict precedence.
+    Canonical Under Fire modifier logic per Ben's v4 audit feedback, over whole arrays.
+    Returns int8 indexes into UNDER_FIRE_MODIFIERS, -1 for the canonical gap.
+    Uses exact outlet boundaries and strict precedence (np.select takes the first rule that holds).
     Fixed: Takedown=4, Body Blow>2 (not 4), Stinger≤3
     """
-    # CANONICAL UNDER FIRE MODIFIERS (Ben's exact v5 audit fix)
+    prom = np.asarray(prom, dtype=float)
+    sent = np.asarray(sent, dtype=float)
+    outlet = np.asarray(outlet, dtype=float)
+    # CANONICAL UNDER FIRE MODIFIERS (Ben's exact v5 audit fix), one condition per UNDER_FIRE_MODIFIERS entry
     # Fixed: Narrative Shaper only fires with Prom ≥ 4, Sent ≤ -3.0, Outlet = 5
     # Fixed: Takedown must be Prom ≥ 3, Sent ≤ -2.0, Outlet = 4
-    if prom >= 4 and sent <= -3.0 and outlet == 5:
-        return "Narrative Shaper"
-    elif prom >= 3 and sent <= -2.0 and outlet == 4:
-        return "Takedown"
-    elif prom >= 3 and sent <= -2.0 and outlet > 2:
-        return "Body Blow"
-    elif prom >= 2.0 and sent <= -2.0 and outlet <= 3:
-        return "Stinger"
-    elif prom >= 2.0 and -2.0 < sent < 0:
-        return "Light Jab"
-    elif prom < 2.0 and sent <= -2.0:
-        return "Collateral Damage"
-    elif prom < 2.0 and -2.0 < sent < 0:
-        return "Peripheral Hit"
-    else:
-        return ""  # True canonical gap
+    conditions = [
+        (prom >= 4) & (sent <= -3.0) & (outlet == 5),
+        (prom >= 3) & (sent <= -2.0) & (outlet == 4),
+        (prom >= 3) & (sent <= -2.0) & (outlet > 2),
+        (prom >= 2.0) & (sent <= -2.0) & (outlet <= 3),
+        (prom >= 2.0) & (-2.0 < sent) & (sent < 0),
+        (prom < 2.0) & (sent <= -2.0),
+        (prom < 2.0) & (-2.0 < sent) & (sent < 0),
+    ]
+    return np.select(conditions, np.arange(len(UNDER_FIRE_MODIFIERS), dtype=np.int8), default=np.int8(-1))
 
 
-def assign_leader_modifier(prom: float, sent: float, outlet: float) -> str:
+def assign_under_fire_modifier_vec(prom, sent, outlet) -> np.ndarray:
+    # Object array of modifier labels, "" where no canonical rule applies
+    return _UNDER_FIRE_LABELS[under_fire_modifier_codes(prom, sent, outlet)]
+
+
+def assign_under_fire_modifier(prom: float, sent: float, outlet: float) -> str:
+    return str(assign_under_fire_modifier_vec(prom, sent, outlet))
+
+
+LEADER_MODIFIERS = ("Narrative Setter", "Breakthrough", "Great Story", "Good Story", "Routine Positive")
+# Label per leader_modifier_codes() code; code -1 picks the trailing ""
+_LEADER_LABELS = np.array(LEADER_MODIFIERS + ("",), dtype=object)
+
+
+def leader_modifier_codes(prom, sent, outlet) -> np.ndarray:
     """
-    Canonical Leader modifier logic per Ben's audit feedback.
+    Canonical Leader modifier logic per Ben's audit feedback, over whole arrays.
     Respects the special Good Story branch.
+    Returns int8 indexes into LEADER_MODIFIERS, -1 where no rule applies.
     """
+    prom = np.asarray(prom, dtype=float)
+    sent = np.asarray(sent, dtype=float)
+    outlet = np.asarray(outlet, dtype=float)
     # Canonical Leader modifiers (respect the special Good Story branch)
-    if prom >= 4 and sent >= 3 and outlet == 5:
-        return "Narrative Setter"
-    elif prom >= 4 and sent >= 3 and outlet >= 4:
-        return "Breakthrough"
-    elif prom >= 3 and sent >= 2 and outlet >= 3:
-        return "Great Story"
-    elif prom >= 3 and ((outlet >= 3 and 1 <= sent < 2) or (outlet < 3 and sent >= 2)):
-        return "Good Story"
-    elif prom >= 3 and sent >= 0:
-        return "Routine Positive"
-    else:
-        return ""
+    conditions = [
+        (prom >= 4) & (sent >= 3) & (outlet == 5),
+        (prom >= 4) & (sent >= 3) & (outlet >= 4),
+        (prom >= 3) & (sent >= 2) & (outlet >= 3),
+        (prom >= 3) & (((outlet >= 3) & (1 <= sent) & (sent < 2)) | ((outlet < 3) & (sent >= 2))),
+        (prom >= 3) & (sent >= 0),
+    ]
+    return np.select(conditions, np.arange(len(LEADER_MODIFIERS), dtype=np.int8), default=np.int8(-1))
+
+
+def assign_leader_modifier_vec(prom, sent, outlet) -> np.ndarray:
+    return _LEADER_LABELS[leader_modifier_codes(prom, sent, outlet)]
+
+
+def assign_leader_modifier(prom: float, sent: float, outlet: float) -> str:
+    return str(assign_leader_modifier_vec(prom, sent, outlet))
+
+
+# Every label an entity modifier column can hold, for its categorical dtype
+MODIFIER_CATEGORIES = tuple(dict.fromkeys(
+    ABSENT_MODIFIERS + OFF_STAGE_MODIFIERS + SUPPORTING_PLAYER_MODIFIERS + UNDER_FIRE_MODIFIERS + LEADER_MODIFIERS + ("",)
+))
+
+
+def assign_entity_modifier_vec(
+    entity_state,
+    outlet_score,
+    entity_prom,
+    entity_sent,
+    topic_prom,
+    topic_sent,
+    dominant_narr_prom,
+    dominant_narr_sent,
+    peer_count_prom_ge_2,
+) -> np.ndarray:
+    # Object array of modifier labels: each state's rules run over the whole column, then every row
+    # takes its own state's label ("" for states without modifiers)
+    entity_state = np.asarray(entity_state, dtype=object)
+    conditions = [
+        entity_state == "Absent",
+        (entity_state == "Off-Stage") | (entity_state == "Offstage"),  # Handle both naming conventions
+        entity_state == "Supporting Player",
+        entity_state == "Under Fire",
+        entity_state == "Leader",
+    ]
+    choices = [
+        assign_absent_modifier_vec(topic_prom, topic_sent),
+        assign_off_stage_modifier_vec(dominant_narr_prom, dominant_narr_sent, peer_count_prom_ge_2),
+        assign_supporting_player_modifier_vec(outlet_score, entity_sent),
+        assign_under_fire_modifier_vec(entity_prom, entity_sent, outlet_score),
+        assign_leader_modifier_vec(entity_prom, entity_sent, outlet_score),
+    ]
+    return np.select(conditions, choices, default="")
 
 
 def assign_entity_modifier(
@@ -528,17 +673,17 @@ def assign_entity_modifier(
     dominant_narr_sent: float,
     peer_count_prom_ge_2: int,
 ) -> str:
-    if entity_state == "Absent":
-        return assign_absent_modifier(topic_prom, topic_sent)
-    if entity_state in ["Off-Stage", "Offstage"]:  # Handle both naming conventions
-        return assign_off_stage_modifier(dominant_narr_prom, dominant_narr_sent, peer_count_prom_ge_2)
-    if entity_state == "Supporting Player":
-        return assign_supporting_player_modifier(outlet_score, entity_sent)
-    if entity_state == "Under Fire":
-        return assign_under_fire_modifier(entity_prom, entity_sent, outlet_score)
-    if entity_state == "Leader":
-        return assign_leader_modifier(entity_prom, entity_sent, outlet_score)
-    return ""
+    return str(assign_entity_modifier_vec(
+        entity_state,
+        outlet_score,
+        entity_prom,
+        entity_sent,
+        topic_prom,
+        topic_sent,
+        dominant_narr_prom,
+        dominant_narr_sent,
+        peer_count_prom_ge_2,
+    ))
 
 
 # -------------------------------
@@ -546,11 +691,11 @@ def assign_entity_modifier(
 # -------------------------------
 
 def process(csv_path: str) -> str:
-    # Initialize dynamic mappings first and get preview
-    mapping_preview = initialize_mappings_from_csv(csv_path)
-    
     df = pd.read_csv(csv_path, low_memory=False)
     
+    # Initialize dynamic mappings from the parsed header and get preview
+    mapping_preview = initialize_mappings_from_csv(csv_path, columns=df.columns.tolist())
+    
     # Check for required columns and provide detailed error message
     missing_cols = []
     
@@ -612,186 +757,139 @@ def process(csv_path: str) -> str:
                 # Has existing states, copy them to our expected column name
                 df[TOPIC_STATE_COL] = df["Topic_Sate"]
 
+    # Score columns are coerced once into float64 arrays that every later stage reuses
+    topic_prom = coerce_float_series(df[TOPIC_PROMINENCE_COL])
+    topic_sent_raw = coerce_float_series(df[TOPIC_SENTIMENT_COL])
+    outlet = coerce_float_series(df[OUTLET_SCORE_COL])
+
     # Derived presence and normalized sentiment for topic
-    df["O_Present"] = df[TOPIC_PROMINENCE_COL].apply(coerce_float).apply(lambda x: is_present(x))
-    df["O_Sent_Normalized"] = (
-        df[TOPIC_SENTIMENT_COL].apply(coerce_float).apply(normalize_sentiment_weak_collapse)
-    )
+    topic_present = topic_prom > 0.0
+    df["O_Present"] = topic_present
+    df["O_Sent_Normalized"] = normalize_sentiment_weak_collapse_vec(topic_sent_raw)
 
-    # Any narrative present?
+    # Any narrative present? Coerced prominences are kept as one (rows, narratives) block in precedence order
+    narr_prom_block = np.zeros((len(df), len(NARRATIVE_TIE_PRECEDENCE)))
+    narr_sent_block = np.zeros_like(narr_prom_block)
     for key, mapping in NARRATIVE_MAPPINGS.items():
         present_col = f"O_M_{key}present"
         sent_norm_col = f"O_M_{key}sent_norm"
-        df[present_col] = df[mapping.prominence].apply(coerce_float).apply(lambda x: is_present(x))
-        df[sent_norm_col] = df[mapping.sentiment].apply(coerce_float).apply(normalize_sentiment_weak_collapse)
-
-        # Assign narrative state
-        def _narr_state_row(row: pd.Series) -> str:
-            # Calculate state based on prominence/sentiment - always recalculate for Business narrative fix
-            prom = coerce_float(row.get(mapping.prominence, 0.0))
-            sent = coerce_float(row.get(mapping.sentiment, 0.0))
-            
-            # Fix 3: Business narrative - When prominence = 0, assign "Absent" deterministically
-            if prom == 0.0:
-                return "Absent"
-            
-            narr_present = is_present(prom)
-            gated_sent = gated_sentiment(prom, sent)
-            return assign_narrative_state(narr_present, prom, gated_sent)
-
-        df[mapping.state] = df.apply(_narr_state_row, axis=1)
-
-    df["O_Any_Narrative_Present"] = (
-        df[[NARRATIVE_MAPPINGS[k].prominence for k in NARRATIVE_TIE_PRECEDENCE]]
-        .apply(lambda s: s.map(coerce_float))
-        .gt(0.0)
-        .any(axis=1)
+        narr_prom = coerce_float_series(df[mapping.prominence])
+        narr_sent = coerce_float_series(df[mapping.sentiment])
+        narr_prom_block[:, NARRATIVE_TIE_PRECEDENCE.index(key)] = narr_prom
+        narr_sent_block[:, NARRATIVE_TIE_PRECEDENCE.index(key)] = narr_sent
+        df[present_col] = narr_prom > 0.0
+        df[sent_norm_col] = normalize_sentiment_weak_collapse_vec(narr_sent)
+
+        # Assign narrative state - always recalculate for Business narrative fix.
+        # Fix 3: Business narrative - prominence 0 is not present, so it is "Absent" deterministically
+        narr_present = narr_prom > 0.0
+        df[mapping.state] = pd.Categorical(
+            assign_narrative_state_vec(narr_present, narr_prom, np.where(narr_present, narr_sent, 0.0)),
+            categories=_NARRATIVE_STATE_LABELS,
+        )
+
+    df["O_Any_Narrative_Present"] = (narr_prom_block > 0.0).any(axis=1)
+
+    # Topic state assignment (gate sentiment by presence), always recalculated.
+    # Fix 2B: prominence 0 is not present, so it is "Absent" deterministically
+    topic_sent = np.where(topic_present, topic_sent_raw, 0.0)
+    df[TOPIC_STATE_COL] = pd.Categorical(
+        assign_topic_state_vec(topic_present, topic_prom, topic_sent), categories=_TOPIC_STATE_LABELS
     )
 
-    # Topic state assignment (gate sentiment by presence)
-    def _topic_state_row(row: pd.Series) -> str:
-        # Always recalculate to ensure proper state assignment
-        prom = coerce_float(row.get(TOPIC_PROMINENCE_COL, 0.0))
-        sent = coerce_float(row.get(TOPIC_SENTIMENT_COL, 0.0))
-        
-        # Fix 2B: When prominence = 0, assign "Absent" deterministically
-        if prom == 0.0:
-            return "Absent"
-        
-        present = is_present(prom)
-        gated = gated_sentiment(prom, sent)
-        return assign_topic_state(present, prom, gated)
-
-    df[TOPIC_STATE_COL] = df.apply(_topic_state_row, axis=1)
-
-    # Counts for tracked entities
-    def _entity_presence_counts(row: pd.Series) -> Tuple[int, int]:
-        presences = []
-        prominent_flags = []
-        for ent_key, ent_map in ENTITY_MAPPINGS.items():
-            prom_val = coerce_float(row.get(ent_map.prominence, 0.0))
-            presences.append(prom_val > 0.0)
-            prominent_flags.append(prom_val >= 2.0)  # Canonical: Use 2.0 threshold for Off-Stage peer counting
-        return sum(presences), sum(prominent_flags)
-
-    counts = df.apply(_entity_presence_counts, axis=1, result_type="expand")
-    df["tracked_entities_in_article"] = counts[0]
-    df["prominent_tracked_entities_in_article"] = counts[1]
-
-    # Central narrative for Off-Stage modifiers
-    central = df.apply(pick_central_narrative, axis=1, result_type="expand")
-    df["O_Central_Key"] = central[0]
-    df["O_Central_Prom"] = central[1]
-    df["O_Central_Sent"] = central[2]
+    # Counts for tracked entities, over a (rows, entities) block of coerced prominences
+    ent_prom_block = np.zeros((len(df), len(ENTITY_MAPPINGS)))
+    for j, ent_map in enumerate(ENTITY_MAPPINGS.values()):
+        ent_prom_block[:, j] = coerce_float_series(df[ent_map.prominence])
+    df["tracked_entities_in_article"] = (ent_prom_block > 0.0).sum(axis=1)
+    # Canonical: Use 2.0 threshold for Off-Stage peer counting
+    df["prominent_tracked_entities_in_article"] = (ent_prom_block >= 2.0).sum(axis=1)
+
+    # Central narrative for Off-Stage modifiers; index -1 (none) picks the trailing "" key and zero scores
+    central = central_narrative_indexes(narr_prom_block, narr_sent_block)
+    rows = np.arange(len(df))
+    no_scores = np.zeros(len(df))
+    # Keys are written as floats ("2.0"), as the per-row (key, prom, sent) results were upcast
+    df["O_Central_Key"] = np.array([float(key) for key in NARRATIVE_TIE_PRECEDENCE] + [""], dtype=object)[central]
+    df["O_Central_Prom"] = np.column_stack([narr_prom_block, no_scores])[rows, central]
+    df["O_Central_Sent"] = np.column_stack([narr_sent_block, no_scores])[rows, central]
 
     # Assign entity states and modifiers
-    for entity_id, mapping in ENTITY_MAPPINGS.items():
+    max_narr_prom = narr_prom_block.max(axis=1) if NARRATIVE_TIE_PRECEDENCE else np.zeros(len(df))
+    # BEN'S V4 AUDIT FIX: dominant narrative (first highest prominence among tracked narratives, above 0)
+    dominant_narr_prom = np.maximum(max_narr_prom, 0.0)
+    dominant_narr_sent = (
+        np.where(max_narr_prom > 0.0, narr_sent_block[rows, narr_prom_block.argmax(axis=1)], 0.0)
+        if NARRATIVE_TIE_PRECEDENCE else np.zeros(len(df))
+    )
+    prominent_count = df["prominent_tracked_entities_in_article"].to_numpy()
+    for j, (entity_id, mapping) in enumerate(ENTITY_MAPPINGS.items()):
         present_col = f"{entity_id}_C_Present"
         sent_norm_col = f"{entity_id}_C_Sent_Normalized"
 
-        df[present_col] = df[mapping.prominence].apply(coerce_float).apply(lambda x: is_present(x))
-        df[sent_norm_col] = df[mapping.sentiment].apply(coerce_float).apply(normalize_sentiment_weak_collapse)
-
-        def _entity_state_row(row: pd.Series) -> str:
-            # Canonical state assignment using Ben's audit feedback
-            entity_prom = coerce_float(row.get(mapping.prominence, 0.0))
-            entity_sent = gated_sentiment(entity_prom, coerce_float(row.get(mapping.sentiment, 0.0)))
-            topic_prom = coerce_float(row.get(TOPIC_PROMINENCE_COL, 0.0))
-            
-            # Get tracked narrative prominences
-            tracked_narr_proms = []
-            for narr_key in NARRATIVE_TIE_PRECEDENCE:
-                narr_mapping = NARRATIVE_MAPPINGS[narr_key]
-                narr_prom = coerce_float(row.get(narr_mapping.prominence, 0.0))
-                tracked_narr_proms.append(narr_prom)
-            
-            return assign_entity_state(entity_prom, entity_sent, topic_prom, tracked_narr_proms)
-
-        def _entity_modifier_row(row: pd.Series) -> str:
-            # Calculate modifiers based on EXISTING entity state from input CSV
-            # DO NOT recalculate state - preserve what's in the input data
-            # Get existing state from CSV, handle NaN values
-            raw_state = row.get(mapping.state, "")
-            entity_state = str(raw_state).strip() if pd.notna(raw_state) else ""
-
-            outlet_score = coerce_float(row.get(OUTLET_SCORE_COL, 0.0))
-            prom = coerce_float(row.get(mapping.prominence, 0.0))
-            sent = gated_sentiment(prom, coerce_float(row.get(mapping.sentiment, 0.0)))
-            topic_prom = coerce_float(row.get(TOPIC_PROMINENCE_COL, 0.0))
-            topic_sent = gated_sentiment(topic_prom, coerce_float(row.get(TOPIC_SENTIMENT_COL, 0.0)))
-
-            # BEN'S V4 AUDIT FIX: Compute dominant narrative and peer count correctly
-            
-            # 1. Find dominant narrative (highest prominence among tracked narratives)
-            dominant_narr_prom = 0.0
-            dominant_narr_sent = 0.0
-            for narr_key in NARRATIVE_TIE_PRECEDENCE:
-                narr_mapping = NARRATIVE_MAPPINGS[narr_key]
-                narr_prom = coerce_float(row.get(narr_mapping.prominence, 0.0))
-                if narr_prom > dominant_narr_prom:
-                    dominant_narr_prom = narr_prom
-                    dominant_narr_sent = gated_sentiment(narr_prom, coerce_float(row.get(narr_mapping.sentiment, 0.0)))
-            
-            # 2. Count peers with Prominence >= 2.0 (OTHER entities, not current one)
-            peer_count_prom_ge_2 = 0
-            current_entity_id = entity_id  # From the outer loop
-            for other_entity_id, other_mapping in ENTITY_MAPPINGS.items():
-                if other_entity_id != current_entity_id:
-                    other_prom = coerce_float(row.get(other_mapping.prominence, 0.0))
-                    if other_prom >= 2.0:
-                        peer_count_prom_ge_2 += 1
-
-            return assign_entity_modifier(
-                entity_state,
-                outlet_score,
-                prom,
-                sent,
-                topic_prom,
-                topic_sent,
-                dominant_narr_prom,
-                dominant_narr_sent,
-                peer_count_prom_ge_2,
-            )
+        ent_prom = ent_prom_block[:, j]
+        ent_sent = coerce_float_series(df[mapping.sentiment])
+        df[present_col] = ent_prom > 0.0
+        df[sent_norm_col] = normalize_sentiment_weak_collapse_vec(ent_sent)
+        ent_sent_gated = np.where(ent_prom > 0.0, ent_sent, 0.0)
 
         # HYBRID STATE HANDLING: 
         # - Preserve existing states (e.g., Bet365 client data)
         # - Calculate missing states (e.g., BetMGM, DraftKings, FanDuel)
         
+        # Canonical state assignment using Ben's audit feedback, computed for every row
+        computed_states = assign_entity_state_vec(ent_prom, ent_sent_gated, topic_prom, max_narr_prom)
         # Check if state column exists and has data
         if mapping.state in df.columns:
             # Fill missing states only - preserve existing ones
-            mask_missing_state = df[mapping.state].isna() | (df[mapping.state] == '') | (df[mapping.state] == 'nan')
-            df.loc[mask_missing_state, mapping.state] = df.loc[mask_missing_state].apply(_entity_state_row, axis=1)
+            missing = missing_state_mask(df[mapping.state])
+            df[mapping.state] = np.where(missing, computed_states, df[mapping.state].to_numpy(dtype=object))
         else:
             # Create new state column - calculate all states
-            df[mapping.state] = df.apply(_entity_state_row, axis=1)
+            df[mapping.state] = computed_states
         
         # Always calculate modifiers based on the final states (preserved + calculated)
         # All canonical states should have complete modifier coverage per trigger document
-        df[mapping.modifier] = df.apply(_entity_modifier_row, axis=1)
-
-    # Basic validation flags
-    def _validation_notes(row: pd.Series) -> str:
-        notes: List[str] = []
+        # Modifiers are based on EXISTING entity states from the input CSV - never recalculated here
+        states = df[mapping.state]
+        entity_state = np.where(states.notna().to_numpy(), states.astype(str).str.strip().to_numpy(dtype=object), "")
+        # Peers with Prominence >= 2.0 are the OTHER entities, not the current one
+        peer_count_prom_ge_2 = prominent_count - (ent_prom >= 2.0)
+        modifiers = assign_entity_modifier_vec(
+            entity_state,
+            outlet,
+            ent_prom,
+            ent_sent_gated,
+            topic_prom,
+            topic_sent,
+            dominant_narr_prom,
+            dominant_narr_sent,
+            peer_count_prom_ge_2,
+        )
+        df[mapping.modifier] = pd.Categorical(modifiers, categories=MODIFIER_CATEGORIES)
+
+    # Basic validation flags, one boolean column per note in output order
+    validation_flags = [
         # Range checks
-        t_prom = coerce_float(row.get(TOPIC_PROMINENCE_COL, 0.0))
-        t_sent = coerce_float(row.get(TOPIC_SENTIMENT_COL, 0.0))
-        outlet = coerce_float(row.get(OUTLET_SCORE_COL, 0.0))
-        if not (0.0 <= t_prom <= 5.0):
-            notes.append("topic_prominence_out_of_range")
-        if not (-4.0 <= t_sent <= 4.0):
-            notes.append("topic_sentiment_out_of_range")
-        if outlet and not (1.0 <= outlet <= 5.0):
-            notes.append("outlet_score_out_of_range")
+        ("topic_prominence_out_of_range", ~((0.0 <= topic_prom) & (topic_prom <= 5.0))),
+        ("topic_sentiment_out_of_range", ~((-4.0 <= topic_sent_raw) & (topic_sent_raw <= 4.0))),
+        ("outlet_score_out_of_range", (outlet != 0.0) & ~((1.0 <= outlet) & (outlet <= 5.0))),
         # Count sanity
-        tracked = int(row.get("tracked_entities_in_article", 0))
-        prominent = int(row.get("prominent_tracked_entities_in_article", 0))
-        if prominent > tracked:
-            notes.append("prominent_count_exceeds_tracked")
-        return ",".join(notes)
-
-    df["validation_notes"] = df.apply(_validation_notes, axis=1)
-    df["is_valid_row"] = df["validation_notes"].apply(lambda x: len(str(x).strip()) == 0)
+        (
+            "prominent_count_exceeds_tracked",
+            df["prominent_tracked_entities_in_article"].to_numpy() > df["tracked_entities_in_article"].to_numpy(),
+        ),
+    ]
+    # Each row's set of flags as a bit pattern, looked up in a table of the joined notes per pattern
+    flag_bits = np.zeros(len(df), dtype=np.int64)
+    for bit, (_, flagged) in enumerate(validation_flags):
+        flag_bits |= flagged.astype(np.int64) << bit
+    notes_by_bits = np.array(
+        [",".join(name for bit, (name, _) in enumerate(validation_flags) if bits >> bit & 1) for bits in range(1 << len(validation_flags))],
+        dtype=object,
+    )
+    df["validation_notes"] = notes_by_bits[flag_bits]
+    df["is_valid_row"] = flag_bits == 0
 
     # -------------------------------
     # POST-PROCESSING FIXES FOR CANONICAL COMPLIANCE
@@ -823,40 +921,37 @@ def process(csv_path: str) -> str:
             if present_col in df.columns:
                 # Simple heuristic: if present=True, use sentiment magnitude to estimate prominence
                 # This is a rough approximation until proper prominence data is available
-                def estimate_prominence(row):
-                    if not row.get(present_col, False):
-                        return 0.0  # Not present = 0 prominence
-                    
-                    # Use sentiment magnitude as rough prominence proxy
-                    sent_normalized = row.get(f"{entity_id}_C_Sent_Normalized", 0.0)
-                    if pd.isna(sent_normalized):
-                        return 1.0  # Present but unknown sentiment = minimal prominence
-                    
-                    # Convert sentiment magnitude to rough prominence scale (0-5)
-                    abs_sent = abs(float(sent_normalized))
-                    if abs_sent >= 3.0:
-                        return 4.0  # High magnitude = high prominence
-                    elif abs_sent >= 2.0:
-                        return 3.0  # Medium-high magnitude
-                    elif abs_sent >= 1.0:
-                        return 2.0  # Medium magnitude
-                    else:
-                        return 1.0  # Low magnitude = minimal prominence
-                
-                df[prominence_col] = df.apply(estimate_prominence, axis=1)
+                # Convert sentiment magnitude to rough prominence scale (0-5), over the whole column
+                present = df[present_col].astype(bool).to_numpy()
+                sent_normalized = df[f"{entity_id}_C_Sent_Normalized"].to_numpy(dtype=float)
+                abs_sent = np.abs(sent_normalized)
+                df[prominence_col] = np.select(
+                    [
+                        ~present,  # Not present = 0 prominence
+                        np.isnan(sent_normalized),  # Present but unknown sentiment = minimal prominence
+                        abs_sent >= 3.0,  # High magnitude = high prominence
+                        abs_sent >= 2.0,  # Medium-high magnitude
+                        abs_sent >= 1.0,  # Medium magnitude
+                    ],
+                    [0.0, 1.0, 4.0, 3.0, 2.0],
+                    default=1.0,  # Low magnitude = minimal prominence
+                )
             else:
                 # Fallback: create zero-filled column
                 df[prominence_col] = 0.0
 
-    # Output path
+    output_path = analysis_output_path(csv_path)
+    df.to_csv(output_path, index=False)
+    return output_path
+
+
+def analysis_output_path(csv_path: str) -> str:
+    """Path that process() writes the Pass 1 output for ``csv_path`` to."""
     if "/" in csv_path:
         dirname, filename = csv_path.rsplit("/", 1)
     else:
         dirname, filename = ".", csv_path
-    output_path = f"{dirname}/Veritical_Analysis_{filename}"
-
-    df.to_csv(output_path, index=False)
-    return output_path
+    return f"{dirname}/Veritical_Analysis_{filename}"
 
 
 def main():
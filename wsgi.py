@@ -0,0 +1,4 @@
+"""WSGI entrypoint: ``gunicorn wsgi:application``."""
+from app import app
+
+application = app